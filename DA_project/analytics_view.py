@@ -7,6 +7,8 @@ import numpy as np
 from pathlib import Path
 from scipy.stats import norm
 
+from panel import build_panel, unstack_panel, rolling_sum, lag, growth
+
 DATA_DIR = Path("data")
 OUT_DIR = Path("outputs")
 OUT_DIR.mkdir(exist_ok=True)
@@ -120,6 +122,45 @@ inv["ROP"] = inv["Demand_Avg"] * LEAD_TIME_WEEKS + inv["Safety_Stock"]
 inv.to_csv(OUT_DIR / "inventory_basics_store_dept.csv", index=False)
 # cols: Store, Dept, Demand_Avg, Demand_Std, Safety_Stock, ROP
 
+# ---------- 8) Rolling windows & year-over-year (per Store–Dept) ----------
+# Dense Store–Dept x week array of the store_dept_weekly grain; every window is
+# a difference of one cumulative sum, so cost is linear in series x weeks.
+ROLL_WEEKS = [4, 13, 52]
+SEASON = 52
+
+index, calendar, sales = build_panel(store_dept_weekly, "Weekly_Sales", fill_value=np.nan)
+observed = ~np.isnan(sales)
+sales = np.nan_to_num(sales)                       # missing week = no sales
+
+# Weekly_Sales itself lives in store_dept_weekly.csv (join on Store, Dept, Date)
+rolling = unstack_panel(index, calendar, sales, "Weekly_Sales", mask=observed).drop(columns="Weekly_Sales")
+rows, cols = np.nonzero(observed)
+for w in ROLL_WEEKS:
+    rolling[f"Sales_{w}W"] = rolling_sum(sales, w)[rows, cols]
+sales_ly = lag(sales, SEASON)
+sales_52w = rolling_sum(sales, SEASON)
+rolling["Sales_LY"] = sales_ly[rows, cols]
+rolling["YoY_Growth"] = growth(sales, sales_ly)[rows, cols]
+rolling["YoY_Growth_52W"] = growth(sales_52w, lag(sales_52w, SEASON))[rows, cols]
+rolling = rolling.round({c: (4 if "Growth" in c else 2) for c in rolling.columns[3:]})
+rolling.to_csv(OUT_DIR / "store_dept_rolling_yoy.csv", index=False)
+# cols: Store, Dept, Date, Sales_4W, Sales_13W, Sales_52W, Sales_LY, YoY_Growth, YoY_Growth_52W
+
+# Compact per-store summary: latest 52 weeks vs the 52 before
+store_ids, store_rows = np.unique(index["Store"].to_numpy(), return_inverse=True)
+store_sales = np.zeros((len(store_ids), sales.shape[1]))
+np.add.at(store_sales, store_rows, sales)
+last_52 = store_sales[:, -SEASON:].sum(axis=1)
+prior_52 = store_sales[:, -2 * SEASON:-SEASON].sum(axis=1) if sales.shape[1] >= 2 * SEASON else np.full(len(store_ids), np.nan)
+store_yoy = pd.DataFrame({
+    "Store": store_ids,
+    "Sales_Last52W": last_52,
+    "Sales_Prior52W": prior_52,
+    "YoY_Growth": growth(last_52, prior_52),
+}).sort_values("YoY_Growth", ascending=False)
+store_yoy.to_csv(OUT_DIR / "store_yoy_summary.csv", index=False)
+# cols: Store, Sales_Last52W, Sales_Prior52W, YoY_Growth
+
 # ---------- Done ----------
 print("Analytics views saved in /outputs:")
 for p in sorted(OUT_DIR.glob("*.csv")):
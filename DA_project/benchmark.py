@@ -0,0 +1,160 @@
+# benchmark.py
+# Wall time and peak RSS of every DA pipeline stage on synthetic data.
+#
+# Generates a Walmart-shaped dataset (synth_data.py) in a scratch folder, runs
+# each stage script there in its own process and appends one record per run to
+# a JSON results file (bench_results/, git-ignored). The previous run at the
+# same scale/worker count is used as the baseline: stages slower than
+# --tolerance are reported as regressions.
+#
+#   python benchmark.py --stores 45 --depts 81 --weeks 143
+#   python benchmark.py --stores 200 --workers 1 --fail-on-regression
+#
+# Note: forecast.py needs at least 66 train weeks (one season + back-test).
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from synth_data import generate
+
+HERE = Path(__file__).resolve().parent
+STAGES = ["prepare_data.py", "finalized_dataset.py", "analytics_view.py", "forecast.py", "inventory.py"]
+RESULTS_JSON = HERE / "bench_results" / "benchmark_results.json"   # git-ignored, kept across runs
+
+
+def run_stage(script, cwd, env):
+    """Run one stage to completion; returns (returncode, wall seconds, peak RSS MB or None)."""
+    log = open(Path(cwd) / f"{Path(script).stem}.log", "w")
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, str(HERE / script)], cwd=cwd, env=env,
+                            stdout=log, stderr=subprocess.STDOUT)
+
+    peak_mb = None
+    if hasattr(os, "wait4"):
+        # rusage of the child (includes its reaped pool workers' max RSS)
+        _, status, usage = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - started
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        # ru_maxrss is KB on Linux, bytes on macOS
+        peak_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    else:
+        try:
+            import psutil
+            p = psutil.Process(proc.pid)
+            peak = 0
+            while proc.poll() is None:
+                try:
+                    peak = max(peak, p.memory_info().rss)
+                except psutil.Error:
+                    break
+                time.sleep(0.05)
+            peak_mb = peak / (1024 * 1024)
+        except ImportError:
+            pass
+        proc.wait()
+        wall = time.perf_counter() - started
+
+    log.close()
+    return proc.returncode, wall, peak_mb
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def previous_run(history, scale, workers):
+    for rec in reversed(history):
+        if rec.get("scale", {}).get("stores") == scale["stores"] and \
+           rec["scale"].get("depts") == scale["depts"] and \
+           rec["scale"].get("weeks") == scale["weeks"] and rec.get("workers") == workers:
+            return rec
+    return None
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the DA pipeline on synthetic data.")
+    ap.add_argument("--stores", type=int, default=45)
+    ap.add_argument("--depts", type=int, default=81)
+    ap.add_argument("--weeks", type=int, default=143)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=None, help="DA_WORKERS for the stages (default: all cores)")
+    ap.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES)
+    ap.add_argument("--results", type=Path, default=RESULTS_JSON)
+    ap.add_argument("--workdir", type=Path, default=None, help="keep data/outputs here instead of a temp dir")
+    ap.add_argument("--tolerance", type=float, default=0.20, help="allowed slowdown vs previous run")
+    ap.add_argument("--fail-on-regression", action="store_true")
+    args = ap.parse_args()
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="da_bench_"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    env = dict(os.environ)
+    if args.workers:
+        env["DA_WORKERS"] = str(args.workers)
+
+    print(f"Generating {args.stores} stores x {args.depts} depts x {args.weeks} weeks in {workdir} …")
+    t0 = time.perf_counter()
+    scale = generate(workdir, args.stores, args.depts, args.weeks, seed=args.seed)
+    print(f"  {scale['train_rows']:,} train rows in {time.perf_counter() - t0:.1f}s")
+
+    results = []
+    for script in args.stages:
+        code, wall, peak_mb = run_stage(script, workdir, env)
+        results.append({"stage": script, "wall_s": round(wall, 3),
+                        "peak_rss_mb": round(peak_mb, 1) if peak_mb is not None else None,
+                        "returncode": code})
+        rss = f"{peak_mb:8.1f} MB" if peak_mb is not None else "       n/a"
+        print(f"  {script:<22} {wall:8.2f}s {rss}" + ("" if code == 0 else f"  FAILED ({code})"))
+        if code != 0:
+            print((workdir / f"{Path(script).stem}.log").read_text()[-2000:])
+            break
+
+    record = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_rev": git_revision(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "workers": args.workers,
+        "scale": scale,
+        "stages": results,
+    }
+
+    history = json.loads(args.results.read_text()) if args.results.exists() else []
+    baseline = previous_run(history, scale, args.workers)
+    history.append(record)
+    args.results.parent.mkdir(parents=True, exist_ok=True)
+    args.results.write_text(json.dumps(history, indent=2))
+    print(f"Results appended to {args.results}")
+
+    regressions = []
+    if baseline:
+        before = {s["stage"]: s["wall_s"] for s in baseline["stages"] if s["returncode"] == 0}
+        for s in results:
+            old = before.get(s["stage"])
+            if old and s["returncode"] == 0 and s["wall_s"] > old * (1 + args.tolerance):
+                regressions.append(s["stage"])
+                print(f"  REGRESSION {s['stage']}: {old:.2f}s -> {s['wall_s']:.2f}s "
+                      f"(baseline {baseline['timestamp']}, rev {baseline['git_rev']})")
+
+    if args.workdir is None:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    failed = any(s["returncode"] != 0 for s in results)
+    if failed or (regressions and args.fail_on_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# inventory.py
+# Forecast-driven safety stock / reorder points per Store–Dept, checked with a
+# Monte Carlo simulation of stock-outs.
+#
+# Compared with the inventory lens in analytics_view.py:
+#   - lead time and service level are per Store–Dept (data/inventory_params.csv,
+#     falling back to the defaults below)
+#   - demand variability comes from the last WINDOW_WEEKS only, not all history
+#   - expected lead-time demand is the sum of the next L forecast weeks
+#     (outputs/forecast_store_dept_weekly.csv from forecast.py) when available
+#   - every series is simulated at once: lead-time demand is bootstrapped from
+#     the recent window around the forecast, and the stock-out probability and
+#     fill rate are reported next to the analytic Safety_Stock/ROP
+#
+# Output: outputs/inventory_policy_store_dept.csv
+
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from scipy.stats import norm
+
+from panel import build_panel, series_index, weekly_calendar
+
+DATA_DIR = Path("data")
+OUT_DIR = Path("outputs")
+PARAMS_CSV = DATA_DIR / "inventory_params.csv"          # optional: Store, Dept, Lead_Time_Weeks, Service_Level
+FORECAST_CSV = OUT_DIR / "forecast_store_dept_weekly.csv"  # optional: from forecast.py
+
+LEAD_TIME_WEEKS = 2        # default when a series has no row in PARAMS_CSV
+SERVICE_LEVEL = 0.95       # default cycle service level
+WINDOW_WEEKS = 13          # recent demand window for variability
+ORDER_CYCLE_WEEKS = 4      # order quantity = this many weeks of expected demand
+N_SIMS = 10_000            # Monte Carlo replenishment cycles per series
+SIM_BLOCK = 4_000_000      # max demand draws held in memory at once
+SEED = 42
+
+
+def load_params(index):
+    """Per-series lead time (int weeks >= 1) and service level, defaults filled in."""
+    params = index.copy()
+    params["Lead_Time_Weeks"] = LEAD_TIME_WEEKS
+    params["Service_Level"] = SERVICE_LEVEL
+    if PARAMS_CSV.exists():
+        custom = pd.read_csv(PARAMS_CSV)
+        cols = [c for c in ["Lead_Time_Weeks", "Service_Level"] if c in custom.columns]  # either may be absent
+        params = params.merge(custom[["Store", "Dept"] + cols], on=["Store", "Dept"], how="left",
+                              suffixes=("_default", ""))
+        for col in cols:
+            params[col] = params[col].fillna(params.pop(f"{col}_default"))
+        params = params[[*index.columns, "Lead_Time_Weeks", "Service_Level"]]
+    params["Lead_Time_Weeks"] = params["Lead_Time_Weeks"].round().clip(lower=1).astype(int)
+    params["Service_Level"] = params["Service_Level"].clip(0.5, 0.9999)
+    return params
+
+
+def load_forecast(index, horizon, fallback):
+    """(S, horizon) weekly forecasts; series/weeks without one use `fallback` (S,)."""
+    fc = np.repeat(fallback[:, None], horizon, axis=1)
+    if FORECAST_CSV.exists():
+        f = pd.read_csv(FORECAST_CSV, parse_dates=["Date"])
+        cal = weekly_calendar(f["Date"])[:horizon]
+        _, _, panel = build_panel(f, "Forecast", index=index, calendar=cal, fill_value=np.nan)
+        fc[:, :panel.shape[1]] = np.where(np.isnan(panel), fc[:, :panel.shape[1]], panel)
+        print(f"Using forecasts from {FORECAST_CSV}")
+    return np.clip(fc, 0, None)
+
+
+def simulate(window, forecast, lead, rop, order_qty, n_sims=N_SIMS, seed=SEED):
+    """
+    Monte Carlo of one replenishment cycle per draw, all series together.
+
+    Weekly demand = forecast for that week + a residual bootstrapped from the
+    series' recent window (clipped at 0). A stock-out happens when demand over
+    the lead time exceeds the reorder point. Returns (stockout_prob, fill_rate).
+    Series are processed in blocks so memory stays at ~SIM_BLOCK draws.
+    """
+    S, W = window.shape
+    resid = (window - window.mean(axis=1, keepdims=True)).astype(np.float32)
+    rng = np.random.default_rng(seed)
+
+    stockout = np.empty(S)
+    fill = np.empty(S)
+    block = max(1, SIM_BLOCK // (n_sims * int(lead.max())))
+    for lo in range(0, S, block):
+        sl = slice(lo, min(lo + block, S))
+        L = int(lead[sl].max())
+        draws = rng.integers(0, W, size=(sl.stop - lo, n_sims, L), dtype=np.int32)
+        weekly = np.take_along_axis(resid[sl, None, :], draws.reshape(sl.stop - lo, 1, -1), axis=2)
+        weekly = weekly.reshape(sl.stop - lo, n_sims, L) + forecast[sl, None, :L].astype(np.float32)
+        np.clip(weekly, 0, None, out=weekly)
+        weekly *= (np.arange(L) < lead[sl, None])[:, None, :]   # ignore weeks beyond own lead time
+        demand = weekly.sum(axis=2)                               # (block, n_sims)
+
+        short = np.clip(demand - rop[sl, None], 0, None)
+        stockout[sl] = (short > 0).mean(axis=1)
+        fill[sl] = 1.0 - np.minimum(short.mean(axis=1) / np.maximum(order_qty[sl], 1e-9), 1.0)
+    return stockout, fill
+
+
+def main():
+    started = time.perf_counter()
+
+    df = pd.read_csv(DATA_DIR / "walmart_train_final.csv", parse_dates=["Date"])
+    index, calendar, Y = build_panel(df, "Weekly_Sales")       # missing week = no sales
+    Y = np.clip(Y, 0, None)                                     # returns are not demand
+
+    # ---------- Recent demand window ----------
+    window = Y[:, -WINDOW_WEEKS:]
+    recent_avg = window.mean(axis=1)
+    recent_std = window.std(axis=1, ddof=1)
+
+    params = load_params(index)
+    lead = params["Lead_Time_Weeks"].to_numpy()
+    z = norm.ppf(params["Service_Level"].to_numpy())
+
+    # ---------- Lead-time demand from the forecast ----------
+    forecast = load_forecast(index, int(lead.max()), fallback=recent_avg)
+    lt_cum = np.cumsum(forecast, axis=1)
+    lt_demand = lt_cum[np.arange(len(index)), lead - 1]
+
+    inv = params.copy()
+    inv["Demand_Avg"] = recent_avg
+    inv["Demand_Std"] = recent_std
+    inv["LeadTime_Demand"] = lt_demand
+    inv["Safety_Stock"] = z * recent_std * np.sqrt(lead)
+    inv["ROP"] = lt_demand + inv["Safety_Stock"]
+    inv["Order_Qty"] = np.maximum(recent_avg, lt_demand / lead) * ORDER_CYCLE_WEEKS
+
+    # ---------- Monte Carlo check ----------
+    sim_started = time.perf_counter()
+    stockout, fill = simulate(window, forecast, lead, inv["ROP"].to_numpy(), inv["Order_Qty"].to_numpy())
+    inv["Stockout_Prob_Sim"] = stockout
+    inv["Fill_Rate_Sim"] = fill
+    print(f"Simulated {len(inv):,} series x {N_SIMS:,} cycles in {time.perf_counter() - sim_started:.1f}s")
+
+    OUT_DIR.mkdir(exist_ok=True)
+    inv.to_csv(OUT_DIR / "inventory_policy_store_dept.csv", index=False)
+    # cols: Store, Dept, Lead_Time_Weeks, Service_Level, Demand_Avg, Demand_Std, LeadTime_Demand,
+    #       Safety_Stock, ROP, Order_Qty, Stockout_Prob_Sim, Fill_Rate_Sim
+
+    print(f"Target service level (mean): {inv['Service_Level'].mean():.3f}")
+    print(f"Simulated in-stock (mean)  : {1 - inv['Stockout_Prob_Sim'].mean():.3f}")
+    print(f"Simulated fill rate (mean) : {inv['Fill_Rate_Sim'].mean():.3f}")
+    print(f"Saved outputs/inventory_policy_store_dept.csv in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
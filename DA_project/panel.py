@@ -0,0 +1,90 @@
+# panel.py
+# Dense (series x week) arrays from the long Store/Dept/Date tables.
+#
+# Row i of a panel is one Store–Dept series (see `keys`), column t is the t-th
+# week of a regular weekly calendar starting at `dates[0]`. Weeks with no row in
+# the source table are filled with `fill_value` (0 = no sales recorded).
+
+import numpy as np
+import pandas as pd
+
+SERIES_KEYS = ["Store", "Dept"]
+
+
+def weekly_calendar(dates, end=None):
+    """Regular 7-day calendar covering `dates` (and up to `end` if given)."""
+    dates = pd.to_datetime(pd.Series(dates))
+    stop = dates.max() if end is None else max(dates.max(), pd.Timestamp(end))
+    return pd.date_range(dates.min(), stop, freq="7D")
+
+
+def week_positions(dates, calendar_start):
+    """Integer week offsets of `dates` relative to `calendar_start`."""
+    delta = pd.to_datetime(pd.Series(dates)).to_numpy() - np.datetime64(calendar_start)
+    return (delta // np.timedelta64(7, "D")).astype(np.int64)
+
+
+def series_index(df, keys=SERIES_KEYS):
+    """Sorted unique key combinations -> the row order of every panel."""
+    return df[keys].drop_duplicates().sort_values(keys).reset_index(drop=True)
+
+
+def build_panel(df, value_col, keys=SERIES_KEYS, index=None, calendar=None,
+                fill_value=0.0, dtype=np.float64):
+    """
+    Scatter `df[value_col]` into a dense (len(index), len(calendar)) array.
+
+    The (keys, Date) grain must be unique — aggregate first otherwise.
+    Rows whose key is not in `index` or whose date is outside `calendar` are
+    dropped. Returns (index, calendar, values).
+    """
+    if index is None:
+        index = series_index(df, keys)
+    if calendar is None:
+        calendar = weekly_calendar(df["Date"])
+
+    rows = pd.MultiIndex.from_frame(index[keys]).get_indexer(pd.MultiIndex.from_frame(df[keys]))
+    cols = week_positions(df["Date"], calendar[0])
+    ok = (rows >= 0) & (cols >= 0) & (cols < len(calendar))
+
+    values = np.full((len(index), len(calendar)), fill_value, dtype=dtype)
+    values[rows[ok], cols[ok]] = df[value_col].to_numpy(dtype=dtype)[ok]
+    return index, calendar, values
+
+
+def unstack_panel(index, calendar, values, value_col, mask=None):
+    """Inverse of build_panel: dense array -> long (keys..., Date, value) frame."""
+    n_series, n_weeks = values.shape
+    rows, cols = (np.nonzero(mask) if mask is not None
+                  else np.divmod(np.arange(n_series * n_weeks), n_weeks))
+    out = index.iloc[rows].reset_index(drop=True)
+    out["Date"] = calendar[cols]
+    out[value_col] = values[rows, cols]
+    return out
+
+
+# ---------- Window helpers (time axis = 1) ----------
+def rolling_sum(values, window):
+    """Trailing `window`-week sums via one cumulative sum; NaN until the window is full."""
+    n_series, n_weeks = values.shape
+    csum = np.zeros((n_series, n_weeks + 1))
+    np.cumsum(values, axis=1, out=csum[:, 1:])
+    out = np.full((n_series, n_weeks), np.nan)
+    if window <= n_weeks:
+        out[:, window - 1:] = csum[:, window:] - csum[:, :n_weeks - window + 1]
+    return out
+
+
+def lag(values, weeks):
+    """Value `weeks` columns earlier; NaN where that is before the first week."""
+    out = np.full(values.shape, np.nan)
+    if weeks < values.shape[1]:
+        out[:, weeks:] = values[:, :values.shape[1] - weeks]
+    return out
+
+
+def growth(current, previous):
+    """(current - previous) / previous, NaN where previous is not positive."""
+    out = np.full(np.shape(current), np.nan)
+    np.divide(current - previous, previous, out=out, where=previous > 0)
+    return out
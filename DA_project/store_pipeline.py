@@ -0,0 +1,92 @@
+# store_pipeline.py
+# Store-partitioned feature engineering for the Walmart merged datasets.
+#
+# Every step in here only ever looks at the rows of one store, so a frame is
+# split by Store, each partition is processed on its own (optionally across a
+# process pool) and the pieces are concatenated back in Store order. The result
+# is identical whatever the number of workers.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+MD_COLS = ["MarkDown1", "MarkDown2", "MarkDown3", "MarkDown4", "MarkDown5"]
+SLOW_COLS = ["CPI", "Unemployment"]   # slow-moving, safe to carry forward/back
+
+
+def default_workers():
+    # DA_WORKERS=1 forces in-process execution (handy for debugging/profiling)
+    env = os.environ.get("DA_WORKERS", "").strip()
+    if env:
+        return max(1, int(env))
+    return os.cpu_count() or 1
+
+
+# ---------- Per-store steps (run inside the workers) ----------
+def prepare_store(part):
+    """Fills + time columns for a single store of a merged (train or test) frame."""
+    part = part.sort_values(["Date", "Dept"], kind="mergesort").copy()
+
+    # MarkDowns are often NA when no promo — fill with 0
+    md_cols = [c for c in MD_COLS if c in part.columns]
+    part[md_cols] = part[md_cols].fillna(0)
+
+    # ffill then bfill, both inside this store only
+    for col in SLOW_COLS:
+        if col in part.columns:
+            part[col] = part[col].ffill().bfill()
+
+    part["Year"] = part["Date"].dt.year
+    part["Week"] = part["Date"].dt.isocalendar().week.astype(int)
+    return part
+
+
+def coalesce_holiday(df):
+    # Some dumps label True/False inconsistently; coalesce then cast to bool
+    hcols = [c for c in df.columns if c.startswith("IsHoliday")]
+    if len(hcols) == 2:
+        df["IsHoliday"] = (df[hcols[0]].astype(int) | df[hcols[1]].astype(int)).astype(bool)
+        df.drop(columns=hcols, inplace=True)
+    elif "IsHoliday" not in df.columns:
+        # fallback: rename the single one to IsHoliday
+        df.rename(columns={hcols[0]: "IsHoliday"}, inplace=True)
+    return df
+
+
+def finalize_store(part):
+    """Holiday coalescing + Promo_Intensity for a single store."""
+    part = coalesce_holiday(part.copy())
+    md_cols = [c for c in part.columns if c.startswith("MarkDown")]
+    part["Promo_Intensity"] = part[md_cols].sum(axis=1)
+    return part
+
+
+# ---------- Driver ----------
+def split_by_store(df):
+    return [g for _, g in df.groupby("Store", sort=True)]
+
+
+def run_by_store(df, func, workers=None):
+    """
+    Apply `func` to every store partition of `df` and concatenate the results.
+
+    `func` must be a module-level function (it gets pickled to the workers).
+    Partitions are dispatched with `Executor.map`, which yields results in
+    submission order, so the output is always sorted by Store regardless of
+    which worker finishes first.
+    """
+    parts = split_by_store(df)
+    if not parts:
+        return func(df)
+
+    workers = min(workers or default_workers(), len(parts))
+    if workers <= 1:
+        results = [func(p) for p in parts]
+    else:
+        # a few partitions per task keeps pickling overhead down on many stores
+        chunksize = max(1, len(parts) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(func, parts, chunksize=chunksize))
+
+    return pd.concat(results, ignore_index=True)
@@ -0,0 +1,106 @@
+# synth_data.py
+# Synthetic Walmart-shaped raw data at any scale, for benchmarking the pipeline.
+#
+# Writes <out>/data/{train,test,features,stores}.csv with the same columns and
+# quirks as the Kaggle files: NA MarkDowns before promos started, NA CPI /
+# Unemployment at the end of the features table, boolean IsHoliday on the four
+# Walmart holiday weeks, and Store–Dept series that start late or have gaps.
+#
+#   python synth_data.py --stores 45 --depts 81 --weeks 143 --out synth
+
+import argparse
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+START = "2010-02-05"       # first Friday in the real train.csv
+TEST_WEEKS = 39            # length of the real test.csv horizon
+MD_COLS = ["MarkDown1", "MarkDown2", "MarkDown3", "MarkDown4", "MarkDown5"]
+
+
+def holiday_weeks(dates):
+    """Super Bowl, Labor Day, Thanksgiving and Christmas weeks (Friday week-ending dates)."""
+    d = pd.DatetimeIndex(dates)
+    nth_friday = (d.day - 1) // 7 + 1
+    super_bowl = (d.month == 2) & (nth_friday == 2)
+    labor_day = (d.month == 9) & (nth_friday == 2)
+    thanksgiving = (d.month == 11) & (d.day >= 23) & (d.day <= 29)
+    christmas = (d.month == 12) & (d.day >= 25)
+    return np.asarray(super_bowl | labor_day | thanksgiving | christmas)
+
+
+def generate(out, stores=45, depts=81, weeks=143, test_weeks=TEST_WEEKS, seed=0):
+    rng = np.random.default_rng(seed)
+    data_dir = Path(out) / "data"
+    data_dir.mkdir(parents=True, exist_ok=True)
+
+    all_dates = pd.date_range(START, periods=weeks + test_weeks, freq="7D")
+    is_hol = holiday_weeks(all_dates)
+    t = np.arange(len(all_dates))
+
+    # ---------- stores.csv ----------
+    size = rng.integers(35_000, 220_000, size=stores)
+    store_type = np.where(size > 150_000, "A", np.where(size > 80_000, "B", "C"))
+    pd.DataFrame({"Store": np.arange(1, stores + 1), "Type": store_type, "Size": size}) \
+      .to_csv(data_dir / "stores.csv", index=False)
+
+    # ---------- features.csv (Store x all weeks) ----------
+    n = stores * len(all_dates)
+    feat = pd.DataFrame({
+        "Store": np.repeat(np.arange(1, stores + 1), len(all_dates)),
+        "Date": np.tile(all_dates, stores),
+        "Temperature": np.tile(60 + 25 * np.sin(2 * np.pi * (t - 10) / 52), stores) + rng.normal(0, 5, n),
+        "Fuel_Price": np.tile(2.6 + 0.01 * t, stores) + rng.normal(0, 0.05, n),
+    })
+    promo_start = int(len(all_dates) * 0.45)   # MarkDowns only exist for the later weeks
+    for i, col in enumerate(MD_COLS):
+        md = rng.gamma(1.5, 2_000 * (i + 1), n)
+        md[np.tile(t < promo_start, stores) | (rng.random(n) < 0.3)] = np.nan
+        feat[col] = md
+    feat["CPI"] = np.repeat(rng.uniform(126, 225, stores), len(all_dates)) * np.tile(1 + 0.0005 * t, stores)
+    feat["Unemployment"] = np.repeat(rng.uniform(4, 14, stores), len(all_dates)) + rng.normal(0, 0.05, n)
+    tail = np.tile(t >= len(all_dates) - test_weeks // 3, stores)   # last test weeks not published yet
+    feat.loc[tail, ["CPI", "Unemployment"]] = np.nan
+    feat["IsHoliday"] = np.tile(is_hol, stores)
+    feat.to_csv(data_dir / "features.csv", index=False, na_rep="NA")
+
+    # ---------- train.csv / test.csv (Store x Dept x weeks, sparse) ----------
+    n_series = stores * depts
+    base = rng.lognormal(9.0, 1.2, n_series) * np.repeat(size / size.mean(), depts)
+    amp = rng.uniform(0.05, 0.4, n_series)
+    start = np.where(rng.random(n_series) < 0.1, rng.integers(0, weeks, n_series), 0)  # late starters
+
+    s_idx = np.repeat(np.arange(n_series), len(all_dates))
+    t_idx = np.tile(t, n_series)
+    keep = (t_idx >= start[s_idx]) & (rng.random(len(s_idx)) > 0.02)          # ~2% random gaps
+    s_idx, t_idx = s_idx[keep], t_idx[keep]
+
+    sales = base[s_idx] * (1 + amp[s_idx] * np.sin(2 * np.pi * t_idx / 52)
+                           + 0.3 * is_hol[t_idx]) * rng.lognormal(0, 0.15, len(s_idx))
+    long = pd.DataFrame({
+        "Store": s_idx // depts + 1,
+        "Dept": s_idx % depts + 1,
+        "Date": all_dates[t_idx],
+        "Weekly_Sales": np.round(sales, 2),
+        "IsHoliday": is_hol[t_idx],
+    })
+    in_train = t_idx < weeks
+    long[in_train].to_csv(data_dir / "train.csv", index=False)
+    long.loc[~in_train, ["Store", "Dept", "Date", "IsHoliday"]].to_csv(data_dir / "test.csv", index=False)
+
+    return {"stores": stores, "depts": depts, "weeks": weeks, "test_weeks": test_weeks,
+            "train_rows": int(in_train.sum()), "test_rows": int((~in_train).sum())}
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Generate Walmart-shaped synthetic raw data.")
+    ap.add_argument("--stores", type=int, default=45)
+    ap.add_argument("--depts", type=int, default=81)
+    ap.add_argument("--weeks", type=int, default=143, help="train weeks")
+    ap.add_argument("--test-weeks", type=int, default=TEST_WEEKS)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default="synth", help="root folder; files go to <out>/data/")
+    args = ap.parse_args()
+
+    info = generate(args.out, args.stores, args.depts, args.weeks, args.test_weeks, args.seed)
+    print(f"Wrote {info['train_rows']:,} train / {info['test_rows']:,} test rows to {Path(args.out) / 'data'}")
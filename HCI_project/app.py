@@ -1,162 +1,308 @@
 import os
+import atexit
 import cv2
 import numpy as np
-import tensorflow as tf
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import MaxPooling2D, Flatten, Dense, Dropout
-from tensorflow.keras.applications import MobileNetV2
-from tensorflow.keras.preprocessing.image import img_to_array
-from tensorflow.keras.applications.mobilenet_v2 import preprocess_input
-from sklearn.preprocessing import LabelEncoder
-import pickle
-from datetime import datetime
+from datetime import datetime, timedelta
 from flask import Flask, Response, render_template, request, redirect, url_for, flash, jsonify
 import sqlite3
 import uuid
+from urllib.parse import urlsplit
 import time
 import shutil
+import threading
+import traceback
 import qrcode
 
+from face_index import FaceIndex, EMBEDDING_SIZE, encode_embeddings, normalize, train_ivf
+from jobs import JobQueue, init_jobs_table
+from face_cache import FeatureCache
+from face_backend import load_backend, model_key
+from camera import Camera
+from db import ConnectionPool
+from attendance_buffer import AttendanceBuffer
+import summaries
+from tracking import FaceTracker, DETECT_EVERY
+from streaming import FrameBroadcaster, MJPEGServer, mjpeg_part
+
 app = Flask(__name__)
 app.secret_key = 'face_attendance_secret_key'
 
 DATASET_DIR = "faces"
 os.makedirs(DATASET_DIR, exist_ok=True)
 
+# Shared webcam: one capture thread feeds the stream, scans and enrollment
+camera = Camera(0)
+atexit.register(camera.close)
+
+# /video_feed runs the detector every N frames and tracks faces in between;
+# VIDEO_DETECT_EVERY=1 detects + recognises on every frame (the old behaviour)
+VIDEO_DETECT_EVERY = int(os.environ.get('VIDEO_DETECT_EVERY', DETECT_EVERY))
+# Port of the asyncio MJPEG server started by `python app.py` (0 = stream from Flask only)
+VIDEO_STREAM_PORT = int(os.environ.get('VIDEO_STREAM_PORT', 5001))
+
+# Embedding backbone: 'keras' (float32 TensorFlow) or 'tflite' (quantised model
+# from export_model.py). Queue a gallery rebuild after switching.
+FACE_BACKEND = os.environ.get('FACE_BACKEND', 'keras')
+FACE_TFLITE_MODEL = os.environ.get('FACE_TFLITE_MODEL', 'models/face_embedder_int8.tflite')
+
 # -------------------- DATABASE SETUP --------------------
+DB_PATH = os.environ.get('ATTENDANCE_DB', 'attendance.db')
+HISTORY_PAGE_SIZE = 50
+db = ConnectionPool(DB_PATH)
+
 def init_db():
-    conn = sqlite3.connect('attendance.db')
-    c = conn.cursor()
-    c.execute('''
-    CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        email TEXT UNIQUE NOT NULL,
-        face_encoding BLOB,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )''')
-    c.execute('''
-    CREATE TABLE IF NOT EXISTS attendance_logs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER,
-        log_type TEXT CHECK(log_type IN ('IN', 'OUT')),
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (user_id) REFERENCES users (id)
-    )''')
-    conn.commit()
-    conn.close()
+    with db.connection() as conn:
+        c = conn.cursor()
+        c.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            face_encoding BLOB,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''')
+        c.execute('''
+        CREATE TABLE IF NOT EXISTS attendance_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            log_type TEXT CHECK(log_type IN ('IN', 'OUT')),
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )''')
+        # Columns added after the first release
+        user_cols = {row[1] for row in c.execute("PRAGMA table_info(users)")}
+        if 'match_threshold' not in user_cols:
+            c.execute("ALTER TABLE users ADD COLUMN match_threshold REAL")
+        log_cols = {row[1] for row in c.execute("PRAGMA table_info(attendance_logs)")}
+        if 'event_id' not in log_cols:
+            c.execute("ALTER TABLE attendance_logs ADD COLUMN event_id TEXT")
+        c.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_attendance_logs_event ON attendance_logs (event_id)")
+        # /history pages newest-first (optionally per user); scans look users up by name
+        c.execute("CREATE INDEX IF NOT EXISTS idx_attendance_logs_timestamp ON attendance_logs (timestamp, id)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_attendance_logs_user ON attendance_logs (user_id, timestamp, id)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_users_name ON users (name)")
+        init_jobs_table(c)
+        summaries.init_summary_tables(c, DATASET_DIR)
+        conn.commit()
 
 init_db()
 
+# Check-ins are queued and written in batches (journaled until committed)
+attendance = AttendanceBuffer(db, DB_PATH + '.events', after_insert=summaries.record_events)
+attendance.start()
+atexit.register(attendance.close)
+
 # -------------------- FACE MODEL --------------------
-def load_faces_from_dataset():
-    faces_data = []
-    labels = []
-    for user_name in os.listdir(DATASET_DIR):
-        user_dir = os.path.join(DATASET_DIR, user_name)
-        if not os.path.isdir(user_dir):
-            continue
-        for img_file in os.listdir(user_dir):
-            img_path = os.path.join(user_dir, img_file)
-            image = cv2.imread(img_path)
-            if image is None:
-                continue
-            image = cv2.resize(image, (224, 224))
-            image = img_to_array(image)
-            image = preprocess_input(image)
-            faces_data.append(image)
-            labels.append(user_name)
-    return faces_data, labels
+EMBED_BATCH = 32
+
+def preprocess_face(face_img):
+    face_img = cv2.resize(face_img, (224, 224)).astype(np.float32)
+    return face_img / 127.5 - 1.0          # mobilenet_v2.preprocess_input, without importing TF
 
 class FaceModel:
+    """
+    Frozen MobileNetV2 backbone (see face_backend) + nearest-neighbour
+    gallery (FaceIndex).
+
+    Every enrolled face image is stored as an L2-normalised embedding in
+    users.face_encoding; recognition is the best cosine similarity against the
+    gallery, accepted above that user's threshold. Enrolling or deleting a user
+    only touches that user's embeddings, nothing is retrained.
+
+    The index is shared between request threads and the job worker: mutations
+    and searches hold `lock`, and a full rebuild is swapped in as a new object.
+
+    The backbone (and TensorFlow) is loaded by `warm_up()` in a background
+    thread, so routes that do not need it serve immediately; `ready` is set
+    once the backbone and gallery are loaded.
+    """
     def __init__(self):
-        self.model = None
-        self.le = None
+        self.backend = None
+        self.detector = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        self.detector_lock = threading.Lock()  # detectMultiScale is not safe to share across threads
+        self.index = FaceIndex()
+        self.lock = threading.Lock()
         self.recognizer_ready = False
-        self.setup_model()
+        self.ready = threading.Event()
+        self.load_error = None
 
     def setup_model(self):
-        if os.path.exists('face_model.h5') and os.path.exists('label_encoder.pkl'):
-            try:
-                self.model = load_model('face_model.h5')
-                self.le = pickle.loads(open('label_encoder.pkl', 'rb').read())
-                self.recognizer_ready = True
-            except:
-                self.create_new_model()
-        else:
-            self.create_new_model()
-
-    def create_new_model(self):
-        base_model = MobileNetV2(weights='imagenet', include_top=False, input_shape=(224, 224, 3))
-        self.model = Sequential([
-            base_model,
-            MaxPooling2D(),
-            Flatten(),
-            Dense(128, activation='relu'),
-            Dropout(0.5),
-            Dense(2, activation='softmax')
-        ])
-        self.model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
-        self.le = LabelEncoder()
-        self.le.fit(['unknown', 'known'])
-        self.recognizer_ready = False
+        self.backend = load_backend(FACE_BACKEND, FACE_TFLITE_MODEL)
+        self.backend(np.zeros((1, 224, 224, 3), dtype=np.float32))    # build/trace before the first face
 
     def detect_faces(self, frame):
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        return cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml').detectMultiScale(gray, 1.1, 5)
+        with self.detector_lock:
+            return self.detector.detectMultiScale(gray, 1.1, 5)
+
+    def embed(self, faces_data):
+        """(n, 224, 224, 3) preprocessed faces -> (n, EMBEDDING_SIZE) unit vectors."""
+        if self.backend is None:
+            raise RuntimeError("Face model is still loading")
+        faces = np.asarray(faces_data, dtype=np.float32)
+        if not len(faces):
+            return np.empty((0, EMBEDDING_SIZE), dtype=np.float32)
+        chunks = [self.backend(faces[i:i + EMBED_BATCH])
+                  for i in range(0, len(faces), EMBED_BATCH)]
+        return normalize(np.concatenate(chunks))
+
+    def load_gallery(self):
+        self.swap_index(FaceIndex.from_db(DB_PATH))
+
+    def swap_index(self, index, load_users=None):
+        """
+        Install `index`. For an index built from an earlier read of the users
+        table, `load_users` returns the current (id, match_threshold) rows:
+        read under the lock, a user deleted or a threshold changed while the
+        index was being built is then either in this read or applied to the
+        new index after the swap, so a deleted user never comes back.
+        """
+        with self.lock:
+            if load_users is not None:
+                current = dict(load_users())
+                for user_id in [u for u in index.user_ids if u not in current]:
+                    index.remove(user_id)
+                for user_id, threshold in current.items():
+                    if user_id in index.names:
+                        index.set_threshold(user_id, threshold)
+            self.index = index
+            self.recognizer_ready = len(index) > 0
+
+    def add_user(self, user_id, name, embeddings):
+        with self.lock:
+            index = self.index
+            index.add(user_id, name, embeddings)
+            self.recognizer_ready = len(index) > 0
+            snapshot = index.snapshot() if index.ivf_due() else None
+        if snapshot is not None:
+            # k-means over the gallery takes seconds: train outside the lock so
+            # recognition keeps running, then install unless a rebuild replaced the index
+            trained = train_ivf(snapshot[0])
+            with self.lock:
+                if self.index is index:
+                    index.install_ivf(trained, snapshot)
+
+    def remove_user(self, user_id):
+        with self.lock:
+            self.index.remove(user_id)
+            self.recognizer_ready = len(self.index) > 0
+
+    def set_threshold(self, user_id, threshold):
+        """Returns the user's effective threshold."""
+        with self.lock:
+            self.index.set_threshold(user_id, threshold)
+            return self.index.threshold(user_id)
+
+    def recognize_faces(self, face_imgs):
+        """
+        One (name, score) per face crop; name is "unknown" below the matched
+        user's threshold. All crops go through the backbone as one batch.
+        """
+        if not self.recognizer_ready or not len(face_imgs):
+            return [("unknown", 0)] * len(face_imgs)
+        queries = self.embed([preprocess_face(face_img) for face_img in face_imgs])
+        with self.lock:
+            matches = self.index.match(queries)
+        return [(name, score) for _, name, score in matches]
 
     def recognize_face(self, face_img):
-        if not self.recognizer_ready:
-            return "unknown", 0
-        face_img = cv2.resize(face_img, (224, 224))
-        face_img = img_to_array(face_img)
-        face_img = preprocess_input(face_img)
-        face_img = np.expand_dims(face_img, axis=0)
-        preds = self.model.predict(face_img)
-        i = np.argmax(preds)
-        return self.le.classes_[i], preds[0][i]
-
-    def train_model(self, faces_data, labels):
-        self.le.fit(list(set(labels)))
-        encoded_labels = self.le.transform(labels)
-        with open('label_encoder.pkl', 'wb') as f:
-            f.write(pickle.dumps(self.le))
-        base_model = MobileNetV2(weights='imagenet', include_top=False, input_shape=(224, 224, 3))
-        self.model = Sequential([
-            base_model,
-            MaxPooling2D(),
-            Flatten(),
-            Dense(128, activation='relu'),
-            Dropout(0.5),
-            Dense(len(self.le.classes_), activation='softmax')
-        ])
-        self.model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
-        y = tf.keras.utils.to_categorical(encoded_labels, len(self.le.classes_))
-        self.model.fit(np.array(faces_data), y, batch_size=32, epochs=5, verbose=1)
-        self.model.save('face_model.h5')
-        self.recognizer_ready = True
+        return self.recognize_faces([face_img])[0]
 
 face_model = FaceModel()
+# Per-image embeddings of faces/<user>, recomputed only for new/changed files
+face_features = FeatureCache(face_model.embed, DATASET_DIR, model_key=model_key(FACE_BACKEND, FACE_TFLITE_MODEL))
+
+def save_embeddings(user_id, embeddings):
+    with db.connection() as conn:
+        conn.execute("UPDATE users SET face_encoding = ? WHERE id = ?", (encode_embeddings(embeddings), user_id))
+        summaries.set_face_images(conn, user_id, len(embeddings))     # one embedding per image
+        conn.commit()
+
+# -------------------- BACKGROUND JOBS --------------------
+def enroll_user(user_id):
+    """Job: embed faces/<name> and store it as this user's gallery entry."""
+    with db.connection() as conn:
+        result = conn.execute("SELECT name FROM users WHERE id = ?", (user_id,)).fetchone()
+    if not result:
+        raise LookupError(f"User {user_id} not found")
+    user_name = result[0]
+    embeddings = face_features.user_features(user_name)
+    if not len(embeddings):
+        raise ValueError(f"No face images for {user_name}")
+    save_embeddings(user_id, embeddings)
+    face_model.add_user(user_id, user_name, embeddings)
+    print(f"[INFO] Enrolled {user_name} with {len(embeddings)} embeddings.")
+    return f"{len(embeddings)} embeddings"
+
+def load_users():
+    with db.connection() as conn:
+        return conn.execute("SELECT id, match_threshold FROM users").fetchall()
+
+def rebuild_gallery(_user_id=None):
+    """Job: rebuild the index from every user's faces/ folder, then swap it in."""
+    with db.connection() as conn:
+        users = conn.execute("SELECT id, name, match_threshold FROM users ORDER BY id").fetchall()
+    gallery = []
+    for user_id, user_name, threshold in users:
+        embeddings = face_features.user_features(user_name)
+        if len(embeddings):
+            gallery.append((user_id, user_name, embeddings, threshold))
+    with db.connection() as conn:
+        for user_id, _, embeddings, _ in gallery:
+            updated = conn.execute("UPDATE users SET face_encoding = ? WHERE id = ?",
+                                   (encode_embeddings(embeddings), user_id)).rowcount
+            if updated:                                  # not deleted since the read above
+                summaries.set_face_images(conn, user_id, len(embeddings))
+        conn.commit()
+    # one concatenation (and at most one IVF training) for the whole gallery, off the lock
+    index = FaceIndex.from_embeddings(gallery)
+    face_model.swap_index(index, load_users)
+    print(f"[INFO] Gallery rebuilt with {len(index)} users.")
+    return f"{len(index)} users"
+
+jobs = JobQueue({'enroll': enroll_user, 'rebuild': rebuild_gallery}, db)
+
+def backfill_embeddings():
+    # Users enrolled before embeddings were stored only have images in faces/
+    with db.connection() as conn:
+        pending = conn.execute("SELECT id, name FROM users WHERE face_encoding IS NULL").fetchall()
+    for user_id, user_name in pending:
+        if os.path.isdir(os.path.join(DATASET_DIR, user_name)):
+            jobs.submit('enroll', user_id)
+
+def warm_up():
+    """Load the backbone and gallery, then start the job worker (which needs both)."""
+    started = time.perf_counter()
+    try:
+        face_model.setup_model()
+        face_model.load_gallery()
+    except Exception as e:
+        traceback.print_exc()
+        face_model.load_error = str(e)
+        return
+    face_model.ready.set()
+    jobs.start()            # requeues interrupted jobs first, so the backfill coalesces into them
+    backfill_embeddings()
+    print(f"[INFO] Face model ready in {time.perf_counter() - started:.1f}s.")
 
-def retrain_model_from_dataset():
-    faces_data, labels = load_faces_from_dataset()
-    print(f"[INFO] Loaded {len(faces_data)} training samples from dataset.")
+threading.Thread(target=warm_up, name='model-warmup', daemon=True).start()
 
-    if faces_data and labels:
-        try:
-            face_model.train_model(faces_data, labels)
-            print("[INFO] Model retrained successfully.")
-        except Exception as e:
-            print(f"[ERROR] Failed to train model: {str(e)}")
-    else:
-        print("[WARN] No training data found. Resetting model.")
-        for file in ['face_model.h5', 'label_encoder.pkl']:
-            if os.path.exists(file):
-                os.remove(file)
-        face_model.recognizer_ready = False
+# One tracker + JPEG encode per camera frame, shared by every viewer of the feed
+broadcaster = FrameBroadcaster(camera, FaceTracker(face_model, detect_every=VIDEO_DETECT_EVERY).annotate)
+atexit.register(broadcaster.close)          # runs before camera.close (atexit is LIFO)
+stream_server = None        # MJPEGServer when running under `python app.py`
 
 
 # -------------------- ROUTES --------------------
+@app.context_processor
+def video_feed_url():
+    if stream_server is not None:
+        host = urlsplit(f"//{request.host}").hostname
+        if ':' in host:
+            host = f"[{host}]"                  # IPv6 literal
+        return {'video_feed_url': f"//{host}:{stream_server.port}/video_feed"}
+    return {'video_feed_url': url_for('video_feed')}
+
 @app.route('/')
 def home():
     return render_template('home.html')
@@ -167,34 +313,74 @@ def scan():
 
 @app.route('/history')
 def history():
-    conn = sqlite3.connect('attendance.db')
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    c.execute("SELECT a.id, u.name, a.log_type, a.timestamp FROM attendance_logs a JOIN users u ON a.user_id = u.id ORDER BY a.timestamp DESC")
-    logs = c.fetchall()
-    c.execute("SELECT id, name FROM users")
-    users = c.fetchall()
-    conn.close()
-    return render_template('history.html', logs=logs, users=users)
+    attendance.flush()                  # include check-ins still in the write-behind buffer
+    with db.connection() as conn:
+        try:
+            logs, next_cursor = history_page(conn, request.args)
+        except ValueError as e:
+            return str(e), 400
+        users = conn.execute("SELECT id, name FROM users ORDER BY name").fetchall()
+    return render_template('history.html', logs=logs, users=users, next_cursor=next_cursor)
+
+@app.route('/api/history')
+def history_api():
+    attendance.flush()
+    with db.connection() as conn:
+        try:
+            logs, next_cursor = history_page(conn, request.args)
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+    return jsonify({'logs': [dict(log) for log in logs], 'next': next_cursor})
+
+def history_page(conn, args):
+    """
+    One page of logs, newest first, filtered by ?date=YYYY-MM-DD and ?user_id=.
+
+    Keyset pagination: ?before=<timestamp>&before_id=<id> (the `next` cursor
+    of the previous page) continues after that row, so every page is an
+    index range scan no matter how deep it is. Raises ValueError for a
+    malformed or half-given cursor.
+    """
+    limit = min(max(args.get('limit', HISTORY_PAGE_SIZE, type=int), 1), 500)
+    where, params = [], []
+    if args.get('user_id'):
+        where.append("a.user_id = ?")
+        params.append(args.get('user_id', type=int))
+    if args.get('date'):
+        try:
+            day = datetime.strptime(args['date'], '%Y-%m-%d')
+        except ValueError:
+            day = None
+        if day is not None:
+            where.append("a.timestamp >= ? AND a.timestamp < ?")
+            params += [day.strftime('%Y-%m-%d'), (day + timedelta(days=1)).strftime('%Y-%m-%d')]
+    if args.get('before') or args.get('before_id'):
+        try:
+            before = datetime.strptime(args.get('before', ''), '%Y-%m-%d %H:%M:%S')
+            before_id = int(args.get('before_id', ''))
+        except ValueError:
+            raise ValueError("before must be 'YYYY-MM-DD HH:MM:SS' and before_id an integer, "
+                             "both from the previous page's cursor") from None
+        where.append("(a.timestamp, a.id) < (?, ?)")
+        params += [before.strftime('%Y-%m-%d %H:%M:%S'), before_id]
+    sql = ("SELECT a.id, u.name, a.log_type, a.timestamp FROM attendance_logs a "
+           "JOIN users u ON a.user_id = u.id"
+           + (" WHERE " + " AND ".join(where) if where else "")
+           + " ORDER BY a.timestamp DESC, a.id DESC LIMIT ?")
+    logs = conn.execute(sql, params + [limit + 1]).fetchall()
+    next_cursor = None
+    if len(logs) > limit:
+        logs = logs[:limit]
+        next_cursor = {'before': logs[-1]['timestamp'], 'before_id': logs[-1]['id']}
+    return logs, next_cursor
 
 @app.route('/profile')
 def profile():
-    conn = sqlite3.connect('attendance.db')
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    c.execute("SELECT * FROM users")
-    users = c.fetchall()
-    conn.close()
-
-    # Add derived flag: has_face_data = True if folder exists and has images
-    enriched_users = []
-    for user in users:
-        user_dict = dict(user)
-        folder = os.path.join("faces", user['name'])
-        has_data = os.path.isdir(folder) and len(os.listdir(folder)) > 0
-        user_dict['has_face_data'] = has_data
-        enriched_users.append(user_dict)
-
+    # image counts come from face_image_counts, kept current by enrollment
+    with db.connection() as conn:
+        users = conn.execute("SELECT u.id, u.name, u.email, u.created_at, coalesce(f.images, 0) AS face_images "
+                             "FROM users u LEFT JOIN face_image_counts f ON f.user_id = u.id").fetchall()
+    enriched_users = [dict(user, has_face_data=user['face_images'] > 0) for user in users]
     return render_template('profile.html', users=enriched_users)
 
 
@@ -204,25 +390,9 @@ def support():
 
 @app.route('/video_feed')
 def video_feed():
-    def generate_frames():
-        camera = cv2.VideoCapture(0)
-        while True:
-            success, frame = camera.read()
-            if not success:
-                break
-            faces = face_model.detect_faces(frame)
-            for (x, y, w, h) in faces:
-                face_img = frame[y:y+h, x:x+w]
-                if face_model.recognizer_ready:
-                    name, prob = face_model.recognize_face(face_img)
-                    label = f"{name}: {prob:.2f}"
-                    cv2.putText(frame, label, (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-                cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
-            ret, buffer = cv2.imencode('.jpg', frame)
-            frame = buffer.tobytes()
-            yield (b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
-        camera.release()
-    return Response(generate_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    # fallback when the asyncio stream server is not running; still encodes once for all viewers
+    return Response((mjpeg_part(jpeg) for jpeg in broadcaster.frames()),
+                    mimetype='multipart/x-mixed-replace; boundary=frame')
 
 @app.route('/register_user', methods=['POST'])
 def register_user():
@@ -230,14 +400,10 @@ def register_user():
     email = request.form.get('email')
     role = request.form.get('role')
 
-    conn = sqlite3.connect('attendance.db')
-    c = conn.cursor()
-
     try:
-        c.execute("INSERT INTO users (name, email) VALUES (?, ?)", (name, email))
-        user_id = c.lastrowid
-        conn.commit()
-        conn.close()
+        with db.connection() as conn:
+            user_id = conn.execute("INSERT INTO users (name, email) VALUES (?, ?)", (name, email)).lastrowid
+            conn.commit()
 
         # ✅ Generate QR code to /scan
         qr = qrcode.make(f'http://localhost:5000/scan')  # Replace with your domain if deployed
@@ -247,7 +413,6 @@ def register_user():
         flash('User registered successfully. Now capturing face data...', 'success')
         return redirect(url_for('register_face_page', user_id=user_id))
     except sqlite3.IntegrityError:
-        conn.close()
         flash('Email already exists', 'danger')
         return redirect(url_for('profile'))
 
@@ -257,9 +422,9 @@ def register_face_page(user_id):
 
 @app.route('/process_face_registration/<int:user_id>', methods=['POST'])
 def process_face_registration(user_id):
-    success = register_face(user_id)
-    if success:
-        flash('Face registered successfully.', 'success')
+    job_id = register_face(user_id)
+    if job_id:
+        flash(f'Face captured. Enrollment is running in the background (job #{job_id}).', 'success')
     else:
         flash('Face registration failed.', 'danger')
     return redirect(url_for('profile'))
@@ -268,11 +433,8 @@ def register_face(user_id, frame_count=20):
     print(f"[INFO] Registering face for user ID: {user_id}")
     
     # Fetch user name
-    conn = sqlite3.connect('attendance.db')
-    c = conn.cursor()
-    c.execute("SELECT name FROM users WHERE id = ?", (user_id,))
-    result = c.fetchone()
-    conn.close()
+    with db.connection() as conn:
+        result = conn.execute("SELECT name FROM users WHERE id = ?", (user_id,)).fetchone()
 
     if not result:
         print("[ERROR] User not found in database.")
@@ -282,17 +444,12 @@ def register_face(user_id, frame_count=20):
     user_folder = os.path.join(DATASET_DIR, user_name)
     os.makedirs(user_folder, exist_ok=True)
 
-    # Open camera
-    camera = cv2.VideoCapture(0)
-    if not camera.isOpened():
-        print("[ERROR] Could not open webcam.")
-        return False
-
     count = 0
+    seq = 0
     while count < frame_count:
-        ret, frame = camera.read()
-        if not ret:
-            print("[ERROR] Failed to read frame.")
+        seq, frame = camera.wait_next(seq)
+        if frame is None:
+            print(f"[ERROR] {camera.error or 'No frame from webcam.'}")
             break
 
         faces = face_model.detect_faces(frame)
@@ -307,94 +464,127 @@ def register_face(user_id, frame_count=20):
             if count >= frame_count:
                 break
 
-    camera.release()
-
     if count == 0:
-        print("[WARN] No images captured for training.")
+        print("[WARN] No images captured for enrollment.")
         return False
 
-    print("[INFO] Finished capturing. Starting model retraining...")
-
-    # Load all faces again from dataset and retrain
-    faces_data = []
-    labels = []
-    for user_name_dir in os.listdir(DATASET_DIR):
-        folder_path = os.path.join(DATASET_DIR, user_name_dir)
-        if not os.path.isdir(folder_path):
-            continue
-        for img_file in os.listdir(folder_path):
-            img_path = os.path.join(folder_path, img_file)
-            image = cv2.imread(img_path)
-            if image is None:
-                continue
-            image = cv2.resize(image, (224, 224))
-            image = img_to_array(image)
-            image = preprocess_input(image)
-            faces_data.append(image)
-            labels.append(user_name)
-
-    if faces_data and labels:
-        face_model.train_model(faces_data, labels)
-        print("[INFO] Model retrained successfully.")
-    else:
-        print("[WARN] No training data found during retraining.")
+    with db.connection() as conn:
+        summaries.set_face_images(conn, user_id, summaries.count_face_images(user_folder))
+        conn.commit()
+    job_id = jobs.submit('enroll', user_id)
+    print(f"[INFO] Finished capturing. Enrollment queued as job #{job_id}.")
+    return job_id
 
-    print("[INFO] Registration complete.")
-    return True
 
 
+@app.route('/api/ready')
+def readiness():
+    if face_model.ready.is_set():
+        return jsonify({'status': 'ready', 'users': len(face_model.index)})
+    if face_model.load_error:
+        return jsonify({'status': 'failed', 'message': face_model.load_error}), 503
+    return jsonify({'status': 'loading'}), 503
 
 @app.route('/api/scan_face', methods=['POST'])
 def scan_face():
-    camera = cv2.VideoCapture(0)
-    time.sleep(1)
-    ret, frame = camera.read()
-    camera.release()
-    if not ret:
+    if not face_model.ready.is_set():
+        return jsonify({'status': 'loading', 'message': 'Face model is still loading'}), 503
+    _, frame = camera.latest()
+    if frame is None:
         return jsonify({'status': 'error', 'message': 'Could not capture frame'})
     faces = face_model.detect_faces(frame)
-    for (x, y, w, h) in faces:
-        face_img = frame[y:y+h, x:x+w]
-        name, prob = face_model.recognize_face(face_img)
-        if prob >= 0.85 and name != "unknown":
-            conn = sqlite3.connect('attendance.db')
-            c = conn.cursor()
-            c.execute("SELECT id, name FROM users WHERE name = ?", (name,))
-            user = c.fetchone()
-            conn.close()
+    results = face_model.recognize_faces([frame[y:y+h, x:x+w] for (x, y, w, h) in faces])
+    for name, prob in results:
+        if name != "unknown":
+            with db.connection() as conn:
+                user = conn.execute("SELECT id, name FROM users WHERE name = ?", (name,)).fetchone()
             if user:
                 return jsonify({'user_id': user[0], 'name': user[1], 'status': 'recognized'})
     return jsonify({'status': 'unrecognized'})
 
+@app.route('/api/users/<int:user_id>/threshold', methods=['POST'])
+def set_match_threshold(user_id):
+    # Empty/missing value resets the user to the default threshold
+    value = request.form.get('threshold') or (request.get_json(silent=True) or {}).get('threshold')
+    try:
+        threshold = float(value) if value not in (None, '') else None
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'threshold must be a number'}), 400
+    if threshold is not None and not 0.0 < threshold <= 1.0:
+        return jsonify({'status': 'error', 'message': 'threshold must be in (0, 1]'}), 400
+    with db.connection() as conn:
+        found = conn.execute("UPDATE users SET match_threshold = ? WHERE id = ?", (threshold, user_id)).rowcount > 0
+        conn.commit()
+    if not found:
+        return jsonify({'status': 'error', 'message': 'User not found'}), 404
+    return jsonify({'status': 'ok', 'user_id': user_id, 'threshold': face_model.set_threshold(user_id, threshold)})
+
+@app.route('/api/reports/attendance')
+def attendance_report():
+    # ?from=YYYY-MM-DD&to=YYYY-MM-DD[&user_id=][&detail=1], read from the daily summaries only
+    try:
+        start = datetime.strptime(request.args['from'], '%Y-%m-%d').date()
+        end = datetime.strptime(request.args['to'], '%Y-%m-%d').date()
+    except (KeyError, ValueError):
+        return jsonify({'status': 'error', 'message': 'from and to must be YYYY-MM-DD dates'}), 400
+    if end < start:
+        return jsonify({'status': 'error', 'message': 'to must not be before from'}), 400
+    attendance.flush()
+    with db.connection() as conn:
+        users = summaries.attendance_report(conn, start.isoformat(), end.isoformat(),
+                                            user_id=request.args.get('user_id', type=int),
+                                            detail=request.args.get('detail') == '1')
+    return jsonify({'from': start.isoformat(), 'to': end.isoformat(), 'users': users})
+
+@app.route('/api/jobs/<int:job_id>')
+def job_status(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/api/jobs/rebuild', methods=['POST'])
+def queue_rebuild():
+    job_id = jobs.submit('rebuild')
+    return jsonify({'job_id': job_id, 'status_url': url_for('job_status', job_id=job_id)}), 202
+
 @app.route('/log_attendance', methods=['POST'])
 def log_attendance():
     user_id = request.form.get('user_id')
     log_type = request.form.get('log_type')
-    conn = sqlite3.connect('attendance.db')
-    c = conn.cursor()
-    c.execute("INSERT INTO attendance_logs (user_id, log_type) VALUES (?, ?)", (user_id, log_type))
-    conn.commit()
-    conn.close()
+    try:
+        attendance.log(user_id, log_type)
+    except (TypeError, ValueError):
+        flash('Invalid attendance entry.', 'danger')
+        return redirect(url_for('scan'))
     flash(f'Attendance {log_type} logged.', 'success')
     return redirect(url_for('scan'))
 
 @app.route('/delete_user/<int:user_id>', methods=['POST'])
 def delete_user(user_id):
-    conn = sqlite3.connect('attendance.db')
-    c = conn.cursor()
-    c.execute("SELECT name FROM users WHERE id = ?", (user_id,))
-    user = c.fetchone()
-    if user:
-        user_folder = os.path.join(DATASET_DIR, user[0])
-        if os.path.exists(user_folder):
-            shutil.rmtree(user_folder)
-    c.execute("DELETE FROM attendance_logs WHERE user_id = ?", (user_id,))
-    c.execute("DELETE FROM users WHERE id = ?", (user_id,))
-    conn.commit()
-    conn.close()
-    retrain_model_from_dataset()
-    flash("User deleted and model retrained.", "success")
+    attendance.flush()                  # so the user's queued check-ins are deleted too
+    with db.connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT name FROM users WHERE id = ?", (user_id,))
+        user = c.fetchone()
+        if user:
+            user_folder = os.path.join(DATASET_DIR, user[0])
+            if os.path.exists(user_folder):
+                shutil.rmtree(user_folder)
+            face_features.drop(user[0])
+        c.execute("DELETE FROM attendance_logs WHERE user_id = ?", (user_id,))
+        summaries.drop_user(c, user_id)
+        c.execute("DELETE FROM users WHERE id = ?", (user_id,))
+        conn.commit()
+    face_model.remove_user(user_id)
+    flash("User deleted.", "success")
     return redirect(url_for("profile"))
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    if VIDEO_STREAM_PORT:
+        stream_server = MJPEGServer(broadcaster, port=VIDEO_STREAM_PORT)
+        stream_server.serve_in_thread()
+    # No reloader: a second process would open the camera, job worker and stream port twice.
+    # FLASK_DEBUG=1 still enables the debugger.
+    app.run(host='0.0.0.0', port=5000, debug=os.environ.get('FLASK_DEBUG') == '1',
+            use_reloader=False, threaded=True)
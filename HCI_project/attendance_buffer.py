@@ -0,0 +1,160 @@
+import json
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+
+LOG_TYPES = ('IN', 'OUT')
+MAX_BATCH = 200            # flush as soon as this many events are waiting
+MAX_DELAY = 0.5            # ... or after this many seconds
+
+
+class AttendanceBuffer:
+    """
+    Write-behind buffer for attendance_logs.
+
+    `log()` stamps the event, appends it to an append-only journal and queues
+    it in memory; a background thread writes queued events in one transaction
+    when MAX_BATCH are waiting or MAX_DELAY has passed. Each event carries a
+    unique event_id and is inserted with INSERT OR IGNORE, so replaying the
+    journal after a crash (`start()`) never duplicates a row.
+
+    Journal lines are flushed to the OS on every event (they survive a crash
+    of the app, not of the machine). At flush time the journal is rotated to
+    `<journal>.flushing` and deleted once the transaction has committed.
+    Call `flush()` before reading logs that must include recent check-ins and
+    `close()` at shutdown.
+
+    `after_insert(conn, events)` runs inside the same transaction (e.g. to
+    maintain summary tables); it must tolerate replayed events.
+    """
+    def __init__(self, pool, journal_path, max_batch=MAX_BATCH, max_delay=MAX_DELAY, after_insert=None):
+        self.pool = pool
+        self.after_insert = after_insert
+        self.journal_path = journal_path
+        self.flushing_path = journal_path + ".flushing"
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.pending = []
+        self.lock = threading.Lock()           # pending + journal file
+        self.flush_lock = threading.Lock()     # one writer transaction at a time
+        self.wakeup = threading.Event()
+        self.journal = None
+        self.thread = None
+        self.closed = False
+
+    def start(self):
+        """Replay events left by a previous run, then start the flusher thread."""
+        if self.thread is not None:
+            return
+        replayed = self._replay()
+        if replayed:
+            print(f"[INFO] Replayed {replayed} attendance events from the journal.")
+        self.journal = open(self.journal_path, 'a', encoding='utf-8')
+        self.thread = threading.Thread(target=self._run, name='attendance-flush', daemon=True)
+        self.thread.start()
+
+    # ---------- Producer side ----------
+    def log(self, user_id, log_type):
+        """Queue one check-in; returns its event_id. Raises ValueError on bad input."""
+        if log_type not in LOG_TYPES:
+            raise ValueError(f"log_type must be one of {LOG_TYPES}")
+        event = {
+            'event_id': uuid.uuid4().hex,
+            'user_id': int(user_id),
+            'log_type': log_type,
+            # same format and clock (UTC) as the column's CURRENT_TIMESTAMP default
+            'timestamp': datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("Attendance buffer is closed")
+            self.journal.write(json.dumps(event) + "\n")
+            self.journal.flush()
+            self.pending.append(event)
+            full = len(self.pending) >= self.max_batch
+        if full:
+            self.wakeup.set()
+        return event['event_id']
+
+    # ---------- Writer side ----------
+    def _insert(self, events):
+        with self.pool.connection() as conn:
+            conn.executemany("INSERT OR IGNORE INTO attendance_logs (event_id, user_id, log_type, timestamp) "
+                             "VALUES (:event_id, :user_id, :log_type, :timestamp)", events)
+            if self.after_insert is not None:
+                self.after_insert(conn, events)
+            conn.commit()
+
+    def flush(self):
+        """Write every queued event in one transaction; returns how many were written."""
+        with self.flush_lock:
+            with self.lock:
+                if not self.pending:
+                    return 0
+                batch, self.pending = self.pending, []
+                # new events go to a fresh journal while this batch commits
+                self.journal.close()
+                os.replace(self.journal_path, self.flushing_path)
+                self.journal = open(self.journal_path, 'a', encoding='utf-8')
+            try:
+                self._insert(batch)
+            except Exception:
+                # keep the .flushing journal and the events; retried on the next flush
+                with self.lock:
+                    self.pending = batch + self.pending
+                    self._merge_flushing()
+                raise
+            os.remove(self.flushing_path)
+            return len(batch)
+
+    def _merge_flushing(self):
+        # put the failed batch back in front of newer journal entries
+        self.journal.close()
+        with open(self.journal_path, encoding='utf-8') as f:
+            newer = f.read()
+        with open(self.flushing_path, 'a', encoding='utf-8') as f:
+            f.write(newer)
+        os.replace(self.flushing_path, self.journal_path)
+        self.journal = open(self.journal_path, 'a', encoding='utf-8')
+
+    def _replay(self):
+        events = []
+        for path in (self.flushing_path, self.journal_path):
+            if not os.path.exists(path):
+                continue
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        events.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        pass                       # torn last line from a crash mid-write
+        if events:
+            self._insert(events)
+        for path in (self.flushing_path, self.journal_path):
+            if os.path.exists(path):
+                os.remove(path)
+        return len(events)
+
+    def _run(self):
+        while not self.closed:
+            self.wakeup.wait(timeout=self.max_delay)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[ERROR] Attendance flush failed, will retry: {e}")
+
+    def close(self):
+        """Flush-on-shutdown hook: stop accepting events and write what is queued."""
+        with self.lock:
+            if self.closed or self.journal is None:
+                self.closed = True
+                return
+            self.closed = True
+        self.wakeup.set()
+        self.flush()
+        with self.lock:
+            self.journal.close()
+        if os.path.exists(self.journal_path) and os.path.getsize(self.journal_path) == 0:
+            os.remove(self.journal_path)
@@ -0,0 +1,75 @@
+# Sustained check-in throughput: one INSERT + commit per event (fresh connection,
+# as before the pool, and pooled) vs. the write-behind AttendanceBuffer.
+#   python bench_attendance_log.py [--events 5000] [--threads 8]
+# Runs against a scratch database; events/s counts until every row is committed.
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+EVENTS_PER_USER = 2
+
+
+def run_threads(n_threads, n_events, fn):
+    per_thread = n_events // n_threads
+    threads = [threading.Thread(target=lambda t=t: [fn(t * per_thread + i) for i in range(per_thread)])
+               for t in range(n_threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return per_thread * n_threads, started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix='attendance-bench-')
+    db_path = os.path.join(scratch, 'attendance.db')
+    os.environ['ATTENDANCE_DB'] = db_path
+    import app                                         # schema, pool and buffer for db_path
+    app.face_model.ready.wait(timeout=120)             # keep model warm-up out of the timings
+    n_users = args.events // EVENTS_PER_USER
+    with app.db.connection() as conn:
+        conn.executemany("INSERT INTO users (name, email) VALUES (?, ?)",
+                         [(f"user{i}", f"user{i}@example.com") for i in range(n_users)])
+        conn.commit()
+
+    def fresh_connection(i):
+        conn = sqlite3.connect(db_path, timeout=30)
+        conn.execute("INSERT INTO attendance_logs (user_id, log_type) VALUES (?, ?)",
+                     (i % n_users + 1, 'IN' if i % 2 else 'OUT'))
+        conn.commit()
+        conn.close()
+
+    def pooled_commit(i):
+        with app.db.connection() as conn:
+            conn.execute("INSERT INTO attendance_logs (user_id, log_type) VALUES (?, ?)",
+                         (i % n_users + 1, 'IN' if i % 2 else 'OUT'))
+            conn.commit()
+
+    def buffered(i):
+        app.attendance.log(i % n_users + 1, 'IN' if i % 2 else 'OUT')
+
+    print(f"{args.events} events from {args.threads} threads")
+    print(f"{'path':<24} {'events/s':>10} {'accept ms':>10}")
+    for name, fn in [("connect+insert+commit", fresh_connection),
+                     ("pooled insert+commit", pooled_commit),
+                     ("write-behind buffer", buffered)]:
+        n, started = run_threads(args.threads, args.events, fn)
+        accepted = time.perf_counter()
+        app.attendance.flush()                         # no-op for the direct paths
+        total = time.perf_counter() - started
+        print(f"{name:<24} {n / total:>10.0f} {(accepted - started) / n * 1000:>10.3f}")
+    app.attendance.close()
+    app.camera.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+# Shared set-up for the bench_*.py scripts that import app.
+# Import it before app: app creates (and migrates) the database ATTENDANCE_DB
+# points at, so this points it at a scratch one and the real attendance.db is
+# never touched. wait_for_model() waits for the background warm-up and exits
+# with the error instead of hanging when the model fails to load.
+import os
+import tempfile
+
+os.environ['ATTENDANCE_DB'] = os.path.join(tempfile.mkdtemp(prefix='attendance-bench-'), 'attendance.db')
+
+
+def wait_for_model(face_model):
+    while not face_model.ready.wait(timeout=0.5) and not face_model.load_error:
+        pass
+    if face_model.load_error:
+        raise SystemExit(f"Face model failed to load: {face_model.load_error}")
@@ -0,0 +1,58 @@
+# Query latency of FaceIndex vs. gallery size (random unit embeddings, no camera/TF needed).
+#   python bench_face_index.py
+import time
+import numpy as np
+
+from face_index import FaceIndex, EMBEDDING_SIZE, normalize
+
+GALLERY_USERS = [100, 1000, 5000, 20000]
+EMBEDDINGS_PER_USER = 10
+BATCHES = [1, 16]
+REPEATS = 20
+NOISE = 0.3 / np.sqrt(EMBEDDING_SIZE)   # per-photo spread around a user's centre
+
+
+def build(n_users, mode, rng):
+    index = FaceIndex(mode=mode)
+    # users are clusters of nearby embeddings, like several photos of one face
+    centers = normalize(rng.standard_normal((n_users, EMBEDDING_SIZE), dtype=np.float32))
+    vectors = np.repeat(centers, EMBEDDINGS_PER_USER, axis=0)
+    vectors += rng.standard_normal(vectors.shape, dtype=np.float32) * np.float32(NOISE)
+    index.vectors = normalize(vectors)
+    index.user_ids = list(range(n_users))
+    index.names = {i: f"user{i}" for i in range(n_users)}
+    index.counts = np.full(n_users, EMBEDDINGS_PER_USER, dtype=np.int64)
+    started = time.perf_counter()
+    index._maybe_build_ivf()
+    return index, centers, time.perf_counter() - started
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'users':>7} {'vectors':>8} {'mode':>6} {'build s':>8} "
+          + " ".join(f"{f'q={b} ms':>9}" for b in BATCHES) + f" {'recall@1':>9}")
+    for n_users in GALLERY_USERS:
+        for mode in ['exact', 'ivf']:
+            index, centers, build_s = build(n_users, mode, rng)
+            timings = []
+            for batch in BATCHES:
+                who = rng.integers(0, n_users, size=batch)
+                queries = normalize(centers[who] + NOISE * rng.standard_normal((batch, EMBEDDING_SIZE)))
+                index.search(queries)                          # warm-up
+                started = time.perf_counter()
+                for _ in range(REPEATS):
+                    index.search(queries)
+                timings.append((time.perf_counter() - started) / REPEATS * 1000)
+
+            who = rng.integers(0, n_users, size=200)
+            queries = normalize(centers[who] + NOISE * rng.standard_normal((200, EMBEDDING_SIZE)))
+            ids, _ = index.search(queries)
+            recall = float(np.mean(ids[:, 0].astype(int) == who))
+            n_vectors = len(index.vectors)
+            del index
+            print(f"{n_users:>7} {n_vectors:>8} {mode:>6} {build_s:>8.2f} "
+                  + " ".join(f"{t:>9.2f}" for t in timings) + f" {recall:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+# How FaceModel holds up as the roster grows: enrollment time (embedding one
+# user's photos, adding them to a gallery of this size, building the whole
+# gallery at once as load_gallery/rebuild_gallery do), recognition latency,
+# batch throughput, memory, and top-1 accuracy / false-accept rate at each
+# user's match threshold (MATCH_THRESHOLD, 0.85, unless set per user).
+#   python bench_face_model.py [--sizes 10 100 500] [--out bench_results/run.json]
+# Uses the backend selected by FACE_BACKEND and a scratch database, and writes
+# one JSON file per run.
+#
+# Identities are the users in faces/ (earlier photos enrolled, later ones
+# probed) plus synthetic ones: a photo put through one fixed, strong warp and
+# recolouring per identity, enrolled and probed through mild per-shot
+# augmentations. Synthetic identities measure scaling and how well the
+# embedding separates transformed faces, not real-world accuracy.
+# IMPOSTORS extra identities are never enrolled; any accepted match for them
+# is a false accept. Matching goes through FaceIndex.match, as /api/scan_face does.
+import argparse
+import json
+import os
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import cv2
+import numpy as np
+
+from bench_common import wait_for_model   # before app: scratch database
+from app import face_model, preprocess_face, FACE_BACKEND, FACE_TFLITE_MODEL, DATASET_DIR
+from face_cache import IMAGE_EXTS
+from face_index import FaceIndex, MATCH_THRESHOLD
+
+GALLERY_SIZES = [10, 100, 500]
+ENROLL_IMAGES = 10          # per identity (register_face captures 20)
+PROBE_IMAGES = 3
+IMPOSTORS = 50
+BATCH_SIZES = [1, 4, 16, 32]
+LATENCY_REPEATS = 50
+ADD_REPEATS = 20            # single-user adds timed per gallery size
+FACE_SIZE = 224
+
+
+def face_photos(dataset_dir):
+    photos = {}
+    for user in sorted(os.listdir(dataset_dir)):
+        user_dir = os.path.join(dataset_dir, user)
+        if os.path.isdir(user_dir):
+            paths = [os.path.join(user_dir, f) for f in sorted(os.listdir(user_dir))
+                     if f.lower().endswith(IMAGE_EXTS)]
+            if paths:
+                photos[user] = paths
+    return photos
+
+
+def load(path):
+    image = cv2.imread(path)
+    return None if image is None else cv2.resize(image, (FACE_SIZE, FACE_SIZE))
+
+
+def warp(image, rng, angle, scale, shift):
+    m = cv2.getRotationMatrix2D((FACE_SIZE / 2, FACE_SIZE / 2), rng.uniform(-angle, angle),
+                                1 + rng.uniform(-scale, scale))
+    m[:, 2] += rng.uniform(-shift, shift, size=2) * FACE_SIZE
+    return cv2.warpAffine(image, m, (FACE_SIZE, FACE_SIZE), borderMode=cv2.BORDER_REFLECT)
+
+
+def new_identity(image, rng):
+    """The fixed look of one synthetic person: geometry, colour balance, gamma, mirroring."""
+    image = warp(image, rng, angle=20, scale=0.2, shift=0.1).astype(np.float32)
+    image *= rng.uniform(0.6, 1.4, size=3)
+    image = 255 * (np.clip(image, 0, 255) / 255) ** rng.uniform(0.6, 1.6)
+    image = image.astype(np.uint8)
+    return cv2.flip(image, 1) if rng.random() < 0.5 else image
+
+
+def shot(image, rng):
+    """One capture of an identity: small pose change, lighting and sensor noise."""
+    image = warp(image, rng, angle=5, scale=0.05, shift=0.03).astype(np.float32)
+    image += rng.uniform(-20, 20) + rng.normal(0, 4, size=image.shape)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+def identities(photos, rng, real_users=True):
+    """Endless (name, enroll crops, probe crops): real users first, then synthetic ones."""
+    for user, paths in (photos.items() if real_users else ()):
+        images = [image for image in map(load, paths) if image is not None]
+        if len(images) > PROBE_IMAGES:
+            yield user, images[:-PROBE_IMAGES][:ENROLL_IMAGES], images[-PROBE_IMAGES:]
+    pool = [path for paths in photos.values() for path in paths]
+    n = 0
+    while True:
+        base = load(pool[rng.integers(len(pool))])
+        if base is None:
+            continue
+        base = new_identity(base, rng)
+        yield (f"synthetic{n}", [shot(base, rng) for _ in range(ENROLL_IMAGES)],
+               [shot(base, rng) for _ in range(PROBE_IMAGES)])
+        n += 1
+
+
+def embed_crops(crops):
+    return face_model.embed([preprocess_face(crop) for crop in crops])
+
+
+def rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except (OSError, ValueError, AttributeError):
+        return None                                     # not Linux
+
+
+def percentile_ms(samples, q):
+    return round(float(np.percentile(samples, q)) * 1000, 2)
+
+
+def accuracy(index, probes, impostor_probes):
+    """probes: (user_id, embeddings) for enrolled users; impostor_probes: embeddings of nobody."""
+    expected = np.concatenate([np.full(len(e), user_id) for user_id, e in probes])
+    queries = np.concatenate([e for _, e in probes])
+    nearest, _ = index.search(queries, k=1)
+    matched = [user_id for user_id, _, _ in index.match(queries)]
+    accepted = np.array([m is not None for m in matched])
+    correct = np.array([m == e for m, e in zip(matched, expected)])
+    impostor_accepted = [m for m, _, _ in index.match(impostor_probes) if m is not None]
+    return {
+        'probes': len(queries),
+        'impostor_probes': len(impostor_probes),
+        'top1_accuracy': round(float(correct.mean()), 4),               # right user, above threshold
+        'rank1_accuracy': round(float(np.mean(nearest[:, 0] == expected)), 4),   # ignoring the threshold
+        'false_reject_rate': round(float(1 - accepted.mean()), 4),
+        'misidentification_rate': round(float(np.mean(accepted & ~correct)), 4),
+        'false_accept_rate': round(len(impostor_accepted) / len(impostor_probes), 4),
+    }
+
+
+def enroll_timings(gallery):
+    """Adding one more user to a gallery of this size, and building the gallery in one pass."""
+    started = time.perf_counter()
+    FaceIndex.from_embeddings(gallery)
+    build_s = time.perf_counter() - started
+    index, add_s = FaceIndex.from_embeddings(gallery), []
+    for i in range(ADD_REPEATS):
+        _, name, embeddings, _ = gallery[i % len(gallery)]
+        started = time.perf_counter()
+        index.add(-1 - i, name, embeddings)             # throwaway copy: ids never probed
+        add_s.append(time.perf_counter() - started)
+    return {'add_ms_p50': percentile_ms(add_s, 50), 'gallery_build_ms': round(build_s * 1000, 1)}
+
+
+def timings(sample_crops):
+    latency = []
+    face_model.recognize_face(sample_crops[0])          # warm-up
+    for i in range(LATENCY_REPEATS):
+        started = time.perf_counter()
+        face_model.recognize_face(sample_crops[i % len(sample_crops)])
+        latency.append(time.perf_counter() - started)
+    throughput = {}
+    for batch in BATCH_SIZES:
+        crops = [sample_crops[i % len(sample_crops)] for i in range(batch)]
+        face_model.recognize_faces(crops)
+        repeats = max(3, 64 // batch)
+        started = time.perf_counter()
+        for _ in range(repeats):
+            face_model.recognize_faces(crops)
+        throughput[str(batch)] = round(batch * repeats / (time.perf_counter() - started), 1)
+    return {'latency_p50_ms': percentile_ms(latency, 50), 'latency_p95_ms': percentile_ms(latency, 95),
+            'faces_per_s': throughput}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=GALLERY_SIZES, help="enrolled users per step")
+    parser.add_argument('--impostors', type=int, default=IMPOSTORS)
+    parser.add_argument('--dataset', default=DATASET_DIR)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help="default: bench_results/face_model_<UTC time>.json")
+    args = parser.parse_args()
+    started_at = datetime.now(timezone.utc)
+    out = args.out or os.path.join("bench_results", f"face_model_{started_at:%Y%m%d-%H%M%S}.json")
+
+    photos = face_photos(args.dataset)
+    if not photos:
+        raise SystemExit(f"No face images under {args.dataset}/ to build galleries from")
+    wait_for_model(face_model)
+    rss_model = rss_mb()
+
+    # impostors come from their own stream so they are the same people at every size
+    impostors = identities(photos, np.random.default_rng([args.seed, 1]), real_users=False)
+    impostor_probes = np.concatenate([embed_crops(next(impostors)[2]) for _ in range(args.impostors)])
+    source = identities(photos, np.random.default_rng(args.seed))
+    sample_crops = []
+
+    # one growing roster; the gallery is built from it at each size, as load_gallery does
+    gallery, probes, results = [], [], []
+    embed_s = 0.0
+    print(f"{'users':>6} {'embed ms/user':>14} {'add ms':>7} {'build ms':>9} {'p50 ms':>7} {'p95 ms':>7} "
+          + " ".join(f"{f'b={b}/s':>7}" for b in BATCH_SIZES)
+          + f" {'gallery MB':>10} {'RSS MB':>7} {'top-1':>6} {'FAR':>6}")
+    for size in sorted(args.sizes):
+        while len(gallery) < size:
+            user_id = len(gallery)
+            name, enroll, probe = next(source)
+            started = time.perf_counter()
+            embeddings = embed_crops(enroll)                    # what enroll_user does, minus disk/DB
+            embed_s += time.perf_counter() - started
+            gallery.append((user_id, name, embeddings, None))
+            probes.append((user_id, embed_crops(probe)))
+            if len(sample_crops) < max(BATCH_SIZES):
+                sample_crops += probe
+        index = FaceIndex.from_embeddings(gallery)
+        face_model.swap_index(index)
+        rss = rss_mb()
+        result = {
+            'users': size,
+            'vectors': len(index.vectors),
+            'embed_total_s': round(embed_s, 2),
+            'embed_ms_per_user': round(embed_s / size * 1000, 1),
+            **enroll_timings(gallery),
+            **timings(sample_crops),
+            'gallery_mb': round(index.vectors.nbytes / 1e6, 2),
+            'rss_mb': None if rss is None else round(rss, 1),
+            'rss_over_model_mb': None if rss is None or rss_model is None else round(rss - rss_model, 1),
+            **accuracy(index, probes, impostor_probes),
+        }
+        results.append(result)
+        rss_text = '-' if rss is None else f"{rss:.0f}"
+        print(f"{size:>6} {result['embed_ms_per_user']:>14.1f} {result['add_ms_p50']:>7.2f} "
+              f"{result['gallery_build_ms']:>9.1f} {result['latency_p50_ms']:>7.1f} "
+              f"{result['latency_p95_ms']:>7.1f} "
+              + " ".join(f"{result['faces_per_s'][str(b)]:>7.1f}" for b in BATCH_SIZES)
+              + f" {result['gallery_mb']:>10.2f} {rss_text:>7} "
+              f"{result['top1_accuracy']:>6.3f} {result['false_accept_rate']:>6.3f}")
+
+    report = {
+        'benchmark': 'face_model',
+        'started_at': started_at.isoformat(timespec='seconds'),
+        'git_commit': git_commit(),
+        'backend': FACE_BACKEND,
+        'tflite_model': FACE_TFLITE_MODEL if FACE_BACKEND == 'tflite' else None,
+        'match_threshold': MATCH_THRESHOLD,
+        'cpu_count': os.cpu_count(),
+        'real_users': sum(1 for paths in photos.values() if len(paths) > PROBE_IMAGES),
+        'enroll_images': ENROLL_IMAGES,
+        'probe_images': PROBE_IMAGES,
+        'impostors': args.impostors,
+        'seed': args.seed,
+        'rss_model_mb': None if rss_model is None else round(rss_model, 1),
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# Per-frame recognition latency for 1, 5 and 20 faces: one backbone call per
+# face (the old path) vs. FaceModel.recognize_faces (one batched call).
+# Uses the backend selected by FACE_BACKEND and a scratch database.
+#   python bench_recognition.py
+import time
+
+import numpy as np
+
+from bench_common import wait_for_model   # before app: scratch database
+from app import face_model, preprocess_face
+from face_index import FaceIndex, EMBEDDING_SIZE, normalize
+
+FACES_PER_FRAME = [1, 5, 20]
+GALLERY_USERS = 1000
+REPEATS = 10
+
+
+def per_face(crops):
+    # pre-batching behaviour: batch size 1 for every face
+    for crop in crops:
+        query = normalize(face_model.backend(np.asarray([preprocess_face(crop)])))
+        with face_model.lock:
+            face_model.index.match(query)
+
+
+def timed(fn, crops):
+    fn(crops)                                           # warm-up
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        fn(crops)
+    return (time.perf_counter() - started) / REPEATS * 1000
+
+
+def main():
+    wait_for_model(face_model)
+    rng = np.random.default_rng(0)
+    index = FaceIndex()
+    for user_id in range(GALLERY_USERS):
+        index.add(user_id, f"user{user_id}", rng.standard_normal((5, EMBEDDING_SIZE), dtype=np.float32))
+    face_model.swap_index(index)
+
+    print(f"{'faces':>5} {'per-face ms':>12} {'batched ms':>11} {'speed-up':>9}")
+    for n in FACES_PER_FRAME:
+        # random crops of typical webcam face sizes; content does not affect latency
+        crops = [rng.integers(0, 256, size=(s, s, 3), dtype=np.uint8) for s in rng.integers(80, 240, size=n)]
+        old = timed(per_face, crops)
+        new = timed(face_model.recognize_faces, crops)
+        print(f"{n:>5} {old:>12.1f} {new:>11.1f} {old / new:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# Cold-start timings of the web app, each in a fresh interpreter:
+#   import      - `import app`
+#   first page  - import + first GET /history (a route that needs no model)
+#   model ready - until /api/ready reports ready (backbone + gallery loaded)
+#   python bench_startup.py [--runs 3] [--db attendance.db]
+# Every run starts from its own scratch database: empty, or a copy of --db
+# (the original is only read), so runs are reproducible and never migrate it.
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+PROBE = r"""
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.app.test_client()
+status = client.get('/history').status_code
+first_page = time.perf_counter()
+while client.get('/api/ready').status_code == 503 and not app.face_model.load_error:
+    time.sleep(0.05)
+ready = time.perf_counter()
+app.camera.close()
+print('RESULT', json.dumps({'import': imported - started, 'first_page': first_page - started,
+                  'ready': ready - started, 'status': status, 'error': app.face_model.load_error}))
+"""
+
+
+def scratch_db(source=None):
+    db_path = os.path.join(tempfile.mkdtemp(prefix='attendance-startup-'), 'attendance.db')
+    if source:
+        # the backup API also picks up pages still in the source's -wal file
+        src = sqlite3.connect(f"file:{os.path.abspath(source)}?mode=ro", uri=True)
+        dst = sqlite3.connect(db_path)
+        src.backup(dst)
+        dst.close()
+        src.close()
+    return db_path
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--db', help="start every run from a copy of this database (default: empty)")
+    args = parser.parse_args()
+    env = dict(os.environ, TF_CPP_MIN_LOG_LEVEL='3')
+    here = os.path.dirname(os.path.abspath(__file__))
+    print(f"backend: {env.get('FACE_BACKEND', 'keras')}")
+    print(f"{'run':>3} {'import s':>9} {'first page s':>13} {'model ready s':>14}")
+    for run in range(args.runs):
+        env['ATTENDANCE_DB'] = scratch_db(args.db)
+        try:
+            out = subprocess.run([sys.executable, '-c', PROBE], cwd=here, env=env,
+                                 capture_output=True, text=True, check=True).stdout
+        finally:
+            shutil.rmtree(os.path.dirname(env['ATTENDANCE_DB']), ignore_errors=True)
+        line = next(l for l in out.splitlines() if l.startswith('RESULT '))
+        result = json.loads(line[len('RESULT '):])
+        if result['error']:
+            sys.exit(f"Model failed to load: {result['error']}")
+        print(f"{run + 1:>3} {result['import']:>9.2f} {result['first_page']:>13.2f} {result['ready']:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
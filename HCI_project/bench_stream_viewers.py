@@ -0,0 +1,108 @@
+# CPU cost of the live feed vs. number of viewers: the old per-viewer loop
+# (own tracker + imencode per client thread) vs. the shared FrameBroadcaster
+# behind the asyncio MJPEGServer (encode once, fan out).
+#   python bench_stream_viewers.py --video clip.mp4 [--viewers 1 5 10] [--seconds 10]
+# CPU % is process CPU time / wall time. Runs against a scratch database with a
+# synthetic gallery of --users users.
+import argparse
+import asyncio
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from bench_common import wait_for_model   # before app: scratch database
+from app import face_model, VIDEO_DETECT_EVERY
+from camera import Camera
+from face_index import FaceIndex, EMBEDDING_SIZE
+from streaming import FrameBroadcaster, MJPEGServer
+from tracking import FaceTracker
+
+
+def per_viewer(camera, n_viewers, seconds):
+    """The pre-broadcast /video_feed: every viewer annotates and encodes on its own."""
+    counts = [0] * n_viewers
+    deadline = time.monotonic() + seconds
+
+    def viewer(i):
+        tracker = FaceTracker(face_model, detect_every=VIDEO_DETECT_EVERY)
+        seq = 0
+        while time.monotonic() < deadline:
+            next_seq, frame = camera.wait_next(seq)
+            if frame is None:
+                continue
+            seq = next_seq
+            cv2.imencode('.jpg', tracker.annotate(frame.copy()))
+            counts[i] += 1
+
+    threads = [threading.Thread(target=viewer, args=(i,)) for i in range(n_viewers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts
+
+
+async def mjpeg_client(port, seconds):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(b'GET /video_feed HTTP/1.1\r\nHost: bench\r\n\r\n')
+    await writer.drain()
+    frames, deadline = 0, time.monotonic() + seconds
+    try:
+        while time.monotonic() < deadline:
+            chunk = await asyncio.wait_for(reader.read(1 << 16), timeout=5)
+            if not chunk:
+                break
+            frames += chunk.count(b'--frame\r\n')
+    finally:
+        writer.close()
+    return frames
+
+
+def broadcast(camera, n_viewers, seconds, port):
+    broadcaster = FrameBroadcaster(camera, FaceTracker(face_model, detect_every=VIDEO_DETECT_EVERY).annotate)
+    server = MJPEGServer(broadcaster, host='127.0.0.1', port=port)
+    server.serve_in_thread()
+    time.sleep(0.2)
+
+    async def viewers():
+        return await asyncio.gather(*(mjpeg_client(port, seconds) for _ in range(n_viewers)))
+    counts = asyncio.run(viewers())
+    broadcaster.close()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--video', default='0', help="video file or camera index")
+    parser.add_argument('--users', type=int, default=100, help="synthetic gallery size")
+    parser.add_argument('--viewers', type=int, nargs='+', default=[1, 5, 10])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--port', type=int, default=5099)
+    args = parser.parse_args()
+    wait_for_model(face_model)
+    # the scratch database has no users: recognise against a synthetic gallery instead
+    rng = np.random.default_rng(0)
+    face_model.swap_index(FaceIndex.from_embeddings(
+        (user_id, f"user{user_id}", rng.standard_normal((5, EMBEDDING_SIZE), dtype=np.float32), None)
+        for user_id in range(args.users)))
+
+    camera = Camera(int(args.video) if args.video.isdigit() else args.video)
+    camera.latest()                                    # open the source before timing
+    print(f"{'mode':<10} {'viewers':>7} {'cpu %':>6} {'fps/viewer':>11}")
+    for n in args.viewers:
+        for mode in ['per-viewer', 'broadcast']:
+            wall, cpu = time.perf_counter(), time.process_time()
+            if mode == 'per-viewer':
+                counts = per_viewer(camera, n, args.seconds)
+            else:
+                counts = broadcast(camera, n, args.seconds, args.port)
+                args.port += 1
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            print(f"{mode:<10} {n:>7} {100 * cpu / wall:>6.0f} {sum(counts) / n / wall:>11.1f}")
+    camera.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# Throughput of the /video_feed loop (detect/track + recognise + JPEG encode) at 720p.
+#   python bench_video_feed.py --video clip.mp4 [--frames 300] [--detect-every 1 5 10]
+# Frames are read up front and upscaled to 1280x720, so capture speed is not measured.
+# CPU % is process CPU time / wall time (can exceed 100 with several busy cores).
+# Runs against a scratch database with a synthetic gallery of --users users.
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from bench_common import wait_for_model   # before app: scratch database
+from app import face_model
+from face_index import FaceIndex, EMBEDDING_SIZE
+from tracking import FaceTracker
+
+RESOLUTION = (1280, 720)
+
+
+def load_frames(source, count):
+    capture = cv2.VideoCapture(source)
+    frames = []
+    while len(frames) < count:
+        ok, frame = capture.read()
+        if not ok:
+            if not frames:
+                raise SystemExit(f"Could not read frames from {source!r}")
+            capture.set(cv2.CAP_PROP_POS_FRAMES, 0)   # loop short clips
+            continue
+        frames.append(cv2.resize(frame, RESOLUTION))
+    capture.release()
+    return frames
+
+
+def run(frames, detect_every):
+    tracker = FaceTracker(face_model, detect_every=detect_every)
+    tracker.annotate(frames[0].copy())                 # warm-up (first predict builds the graph)
+    tracker = FaceTracker(face_model, detect_every=detect_every)
+    wall, cpu = time.perf_counter(), time.process_time()
+    for frame in frames:
+        cv2.imencode('.jpg', tracker.annotate(frame.copy()))
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    return len(frames) / wall, 100 * cpu / wall, tracker.stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--video', default='0', help="video file or camera index")
+    parser.add_argument('--users', type=int, default=100, help="synthetic gallery size")
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--detect-every', type=int, nargs='+', default=[1, 5, 10])
+    args = parser.parse_args()
+    wait_for_model(face_model)
+    # the scratch database has no users: recognise against a synthetic gallery instead
+    rng = np.random.default_rng(0)
+    face_model.swap_index(FaceIndex.from_embeddings(
+        (user_id, f"user{user_id}", rng.standard_normal((5, EMBEDDING_SIZE), dtype=np.float32), None)
+        for user_id in range(args.users)))
+
+    source = int(args.video) if args.video.isdigit() else args.video
+    frames = load_frames(source, args.frames)
+    print(f"{len(frames)} frames at {RESOLUTION[0]}x{RESOLUTION[1]}, "
+          f"{len(face_model.index.user_ids)} enrolled users")
+    print(f"{'detect every':>12} {'fps':>7} {'cpu %':>7} {'detections':>11} {'recognitions':>13}")
+    for n in args.detect_every:
+        fps, cpu, stats = run(frames, n)
+        print(f"{n:>12} {fps:>7.1f} {cpu:>7.0f} {stats['detections']:>11} {stats['recognitions']:>13}")
+
+
+if __name__ == "__main__":
+    main()
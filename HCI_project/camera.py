@@ -0,0 +1,103 @@
+import collections
+import threading
+import time
+
+import cv2
+
+IDLE_TIMEOUT = 30.0        # release the webcam after this many seconds without readers
+REOPEN_DELAY = 1.0         # wait before retrying a camera that failed to open/read
+
+
+class Camera:
+    """
+    One long-lived capture thread per video source, shared by every reader.
+
+    The thread keeps the last `buffer_size` frames in a ring buffer, each with
+    a sequence number. Readers never touch cv2.VideoCapture: `latest()` returns
+    the newest frame immediately and `wait_next()` blocks until a newer one
+    arrives, so any number of MJPEG streams and API calls can share the device.
+    Returned frames are shared — copy before drawing on them.
+
+    The thread starts on first use and releases the device after IDLE_TIMEOUT
+    seconds without readers.
+    """
+    def __init__(self, source=0, buffer_size=8):
+        self.source = source
+        self.frames = collections.deque(maxlen=buffer_size)    # (seq, timestamp, frame)
+        self.seq = 0
+        self.cond = threading.Condition()
+        self.thread = None
+        self.last_access = time.monotonic()
+        self.error = None
+        self.closed = False
+
+    def _ensure_running(self):
+        with self.cond:
+            self.last_access = time.monotonic()
+            if self.thread is None and not self.closed:
+                self.thread = threading.Thread(target=self._run, name='camera', daemon=True)
+                self.thread.start()
+
+    def _run(self):
+        capture = None
+        try:
+            while True:
+                with self.cond:
+                    if self.closed or time.monotonic() - self.last_access >= IDLE_TIMEOUT:
+                        # decided under the lock, so a new reader either kept us
+                        # alive or will start a fresh thread
+                        self.thread = None
+                        self.frames.clear()
+                        return
+                if capture is None:
+                    capture = cv2.VideoCapture(self.source)
+                    if not capture.isOpened():
+                        self.error = "Could not open webcam"
+                        capture.release()
+                        capture = None
+                        time.sleep(REOPEN_DELAY)
+                        continue
+                ok, frame = capture.read()
+                if not ok:
+                    self.error = "Failed to read frame"
+                    capture.release()
+                    capture = None
+                    time.sleep(REOPEN_DELAY)
+                    continue
+                with self.cond:
+                    self.error = None
+                    self.seq += 1
+                    self.frames.append((self.seq, time.time(), frame))
+                    self.cond.notify_all()
+        finally:
+            if capture is not None:
+                capture.release()
+
+    def latest(self, timeout=2.0):
+        """(seq, frame) of the newest frame, waiting up to `timeout` for the first one."""
+        self._ensure_running()
+        with self.cond:
+            if not self.frames:
+                self.cond.wait_for(lambda: self.frames, timeout=timeout)
+            if not self.frames:
+                return None, None
+            seq, _, frame = self.frames[-1]
+            return seq, frame
+
+    def wait_next(self, last_seq, timeout=2.0):
+        """(seq, frame) of the first frame newer than `last_seq`, or (None, None) on timeout."""
+        self._ensure_running()
+        with self.cond:
+            self.cond.wait_for(lambda: self.frames and self.frames[-1][0] > last_seq, timeout=timeout)
+            if not self.frames or self.frames[-1][0] <= last_seq:
+                return None, None
+            seq, _, frame = self.frames[-1]
+            return seq, frame
+
+    def close(self):
+        """Stop the capture thread and release the device (e.g. at shutdown)."""
+        with self.cond:
+            self.closed = True
+            thread = self.thread
+        if thread is not None:
+            thread.join(timeout=2.0)
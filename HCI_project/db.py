@@ -0,0 +1,51 @@
+import contextlib
+import queue
+import sqlite3
+
+DB_PATH = "attendance.db"
+POOL_SIZE = 8
+
+
+class ConnectionPool:
+    """
+    Reusable SQLite connections for request threads and background workers.
+
+    Each borrowed connection belongs to one thread until it is returned, so
+    nothing is shared concurrently; connections are opened with
+    check_same_thread=False only so they can be handed to the next thread.
+    Every connection uses WAL journaling (readers never block the writer)
+    and returns rows as sqlite3.Row. At most `size` idle connections are
+    kept; extra ones opened under load are closed when returned.
+    """
+    def __init__(self, path=DB_PATH, size=POOL_SIZE):
+        self.path = path
+        self.idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")     # safe with WAL, fsync only at checkpoints
+        return conn
+
+    def acquire(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()                              # never hand over a half-done transaction
+        try:
+            self.idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    @contextlib.contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
@@ -0,0 +1,103 @@
+# Export the face backbone to TFLite and check it against the Keras model on faces/.
+#   python export_model.py [--quantization int8|float16|dynamic] [--out models/face_embedder_int8.tflite]
+#   python export_model.py --check models/face_embedder_int8.tflite   # parity of an existing export only
+# Then run the app with FACE_BACKEND=tflite (FACE_TFLITE_MODEL=<path> if not the default).
+# Exits non-zero if the TFLite model drifts too far from Keras, so it can gate a deploy
+# (or a CI job / kiosk update that ships an already exported model).
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from face_backend import KerasBackend, TFLiteBackend, QUANTIZATIONS, export_tflite
+from face_cache import IMAGE_EXTS, image_dataset
+from face_index import normalize
+
+DATASET_DIR = "faces"
+LATENCY_REPEATS = 20
+
+
+def face_images(dataset_dir):
+    labels, paths = [], []
+    for user in sorted(os.listdir(dataset_dir)):
+        user_dir = os.path.join(dataset_dir, user)
+        if not os.path.isdir(user_dir):
+            continue
+        for name in sorted(os.listdir(user_dir)):
+            if name.lower().endswith(IMAGE_EXTS):
+                labels.append(user)
+                paths.append(os.path.join(user_dir, name))
+    return np.array(labels), paths
+
+
+def embed_all(backend, paths):
+    return normalize(np.concatenate([backend(batch) for batch in image_dataset(paths)]))
+
+
+def nearest_user(embeddings, labels):
+    # leave-one-out: each image is matched against every other enrolled image
+    sims = embeddings @ embeddings.T
+    np.fill_diagonal(sims, -np.inf)
+    return labels[np.argmax(sims, axis=1)]
+
+
+def latency_ms(backend):
+    face = np.random.default_rng(0).uniform(-1, 1, size=(1, 224, 224, 3)).astype(np.float32)
+    backend(face)                                        # warm-up
+    started = time.perf_counter()
+    for _ in range(LATENCY_REPEATS):
+        backend(face)
+    return (time.perf_counter() - started) / LATENCY_REPEATS * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--quantization', choices=QUANTIZATIONS, default='int8')
+    parser.add_argument('--out', help="default: models/face_embedder_<quantization>.tflite")
+    parser.add_argument('--check', metavar='TFLITE', help="skip the export; check this model's parity with Keras")
+    parser.add_argument('--dataset', default=DATASET_DIR)
+    parser.add_argument('--min-cosine', type=float, default=0.95,
+                        help="fail if the mean Keras/TFLite cosine similarity is below this")
+    parser.add_argument('--min-agreement', type=float, default=0.98,
+                        help="fail if fewer images get the same nearest user under both backends")
+    args = parser.parse_args()
+    out = args.out or os.path.join("models", f"face_embedder_{args.quantization}.tflite")
+
+    labels, paths = face_images(args.dataset)
+    if not paths:
+        sys.exit(f"No face images under {args.dataset}/ to calibrate and check against")
+
+    keras = KerasBackend()
+    if args.check:
+        out = args.check
+    else:
+        started = time.perf_counter()
+        export_tflite(keras.model, out, args.quantization, representative_paths=paths)
+        print(f"Exported {out} ({os.path.getsize(out) / 1e6:.1f} MB, {args.quantization}) "
+              f"in {time.perf_counter() - started:.1f}s")
+    started = time.perf_counter()
+    lite = TFLiteBackend(out)
+    print(f"TFLite load: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    reference, candidate = embed_all(keras, paths), embed_all(lite, paths)
+    cosine = np.sum(reference * candidate, axis=1)
+    print(f"{len(paths)} images, {len(set(labels))} users")
+    print(f"cosine(keras, tflite): mean {cosine.mean():.4f}  min {cosine.min():.4f}")
+
+    agreement = 1.0
+    if len(set(labels)) > 1:
+        ref_users, cand_users = nearest_user(reference, labels), nearest_user(candidate, labels)
+        agreement = float(np.mean(ref_users == cand_users))
+        print(f"top-1 accuracy: keras {np.mean(ref_users == labels):.3f}  "
+              f"tflite {np.mean(cand_users == labels):.3f}  agreement {agreement:.3f}")
+    print(f"latency per face: keras {latency_ms(keras):.1f} ms  tflite {latency_ms(lite):.1f} ms")
+
+    if cosine.mean() < args.min_cosine or agreement < args.min_agreement:
+        sys.exit("Parity check FAILED: keep FACE_BACKEND=keras or try --quantization float16")
+    print("Parity check passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import os
+import threading
+
+import numpy as np
+
+from face_cache import image_dataset
+
+# TensorFlow is imported inside the functions that need it: the TFLite backend
+# runs on the standalone LiteRT runtime when it is installed, without loading TF.
+
+INPUT_SHAPE = (224, 224, 3)
+QUANTIZATIONS = ('int8', 'float16', 'dynamic')
+REPRESENTATIVE_SAMPLES = 200
+
+
+def build_backbone():
+    """Frozen ImageNet MobileNetV2, global-average pooled to one 1280-d vector per face."""
+    from tensorflow.keras.applications import MobileNetV2
+    model = MobileNetV2(weights='imagenet', include_top=False, pooling='avg', input_shape=INPUT_SHAPE)
+    model.trainable = False
+    return model
+
+
+def _signature(model):
+    import tensorflow as tf
+    # one graph for any batch size
+    return tf.function(lambda x: model(x, training=False),
+                       input_signature=[tf.TensorSpec([None, *INPUT_SHAPE], tf.float32)])
+
+
+class KerasBackend:
+    """The backbone run by TensorFlow in float32."""
+    name = 'keras'
+
+    def __init__(self, model=None):
+        self.model = model if model is not None else build_backbone()
+        # direct model call instead of predict(), which rebuilds a dataset and
+        # callbacks per call
+        self.infer = _signature(self.model)
+
+    def __call__(self, faces):
+        return self.infer(faces).numpy()
+
+
+def _interpreter_class():
+    try:                               # standalone LiteRT runtime, if installed on the kiosk
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+def model_key(name, model_path=None):
+    """
+    Identifies the embedding space a backend produces: the backend name, and
+    for TFLite the model file with its mtime (a re-export changes it).
+    Features computed under one key are not valid under another.
+    """
+    if name == 'tflite':
+        path = os.path.abspath(model_path)
+        mtime = os.stat(path).st_mtime_ns if os.path.exists(path) else None
+        return f"tflite:{path}:{mtime}"
+    return name
+
+
+class TFLiteBackend:
+    """
+    An exported .tflite backbone (see export_tflite).
+
+    The interpreter is not thread-safe, so calls are serialised; tensors are
+    only reallocated when the batch size changes.
+    """
+    name = 'tflite'
+
+    def __init__(self, model_path, num_threads=None):
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"{model_path} not found; run `python export_model.py` first")
+        self.interpreter = _interpreter_class()(model_path=model_path, num_threads=num_threads or os.cpu_count())
+        self.input = self.interpreter.get_input_details()[0]['index']
+        self.output = self.interpreter.get_output_details()[0]['index']
+        self.batch = None
+        self.lock = threading.Lock()
+
+    def __call__(self, faces):
+        faces = np.ascontiguousarray(faces, dtype=np.float32)
+        with self.lock:
+            if len(faces) != self.batch:
+                self.interpreter.resize_tensor_input(self.input, faces.shape)
+                self.interpreter.allocate_tensors()
+                self.batch = len(faces)
+            self.interpreter.set_tensor(self.input, faces)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self.output).copy()
+
+
+def load_backend(name, model_path=None):
+    if name == 'keras':
+        return KerasBackend()
+    if name == 'tflite':
+        return TFLiteBackend(model_path)
+    raise ValueError(f"Unknown face backend: {name}")
+
+
+def export_tflite(model, out_path, quantization='int8', representative_paths=()):
+    """
+    Convert the Keras backbone to TFLite.
+
+    'int8' quantises weights and activations (calibrated on
+    `representative_paths`, e.g. the enrolled faces/ images), 'float16' halves
+    the weights only, 'dynamic' quantises weights to int8 with float activations.
+    Inputs and outputs stay float32, so callers do not change.
+    """
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unknown quantization: {quantization}")
+    import tensorflow as tf
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == 'float16':
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == 'int8':
+        if not representative_paths:
+            raise ValueError("int8 quantization needs representative images")
+        samples = image_dataset(list(representative_paths)[:REPRESENTATIVE_SAMPLES], batch_size=1)
+        converter.representative_dataset = lambda: ([batch] for batch in samples)
+    os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+    with open(out_path, 'wb') as f:
+        f.write(converter.convert())
+    return out_path
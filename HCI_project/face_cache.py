@@ -0,0 +1,128 @@
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+
+CACHE_DIR = "face_cache"
+IMAGE_SIZE = (224, 224)
+BATCH_SIZE = 32
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png')
+
+
+def image_dataset(paths, batch_size=BATCH_SIZE):
+    """
+    tf.data pipeline: read + decode + resize + preprocess image files in
+    parallel, batched and prefetched so the backbone never waits on disk.
+
+    Channels are flipped to BGR to match frames coming from OpenCV.
+    """
+    # imported here so the web app can start without loading TensorFlow
+    import tensorflow as tf
+    from tensorflow.keras.applications.mobilenet_v2 import preprocess_input
+
+    def load(path):
+        image = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+        image = tf.image.resize(tf.reverse(image, axis=[-1]), IMAGE_SIZE)
+        return preprocess_input(image)
+
+    return (tf.data.Dataset.from_tensor_slices(list(paths))
+            .map(load, num_parallel_calls=tf.data.AUTOTUNE)
+            .batch(batch_size)
+            .prefetch(tf.data.AUTOTUNE))
+
+
+class FeatureCache:
+    """
+    Per-user cache of backbone features for the images under faces/<user>.
+
+    face_cache/<user>/features.npy holds one float32 row per image (opened
+    memory-mapped) and manifest.json records the file name, mtime and size
+    behind every row. On each call only images that are new or changed since
+    the manifest are run through the backbone; rows of deleted images are
+    dropped. Shards are replaced atomically (write temp file, os.replace).
+
+    `embed_batch` maps a batch of preprocessed images to feature rows, and
+    `model_key` names the model behind it (face_backend.model_key). It is
+    stored in every manifest; a shard written under another key (another
+    backend, or a re-exported model) is re-embedded from scratch.
+    """
+    def __init__(self, embed_batch, dataset_dir="faces", cache_dir=CACHE_DIR, model_key=None):
+        self.embed_batch = embed_batch
+        self.model_key = model_key
+        self.dataset_dir = dataset_dir
+        self.cache_dir = cache_dir
+        self.lock = threading.Lock()           # one updater at a time per process
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, user_name):
+        shard_dir = os.path.join(self.cache_dir, user_name)
+        return shard_dir, os.path.join(shard_dir, "features.npy"), os.path.join(shard_dir, "manifest.json")
+
+    def _scan(self, user_name):
+        user_dir = os.path.join(self.dataset_dir, user_name)
+        if not os.path.isdir(user_dir):
+            return {}
+        current = {}
+        for entry in os.scandir(user_dir):
+            if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTS):
+                st = entry.stat()
+                current[entry.name] = [st.st_mtime_ns, st.st_size]
+        return current
+
+    def _load(self, user_name):
+        _, features_path, manifest_path = self._paths(user_name)
+        if not (os.path.exists(features_path) and os.path.exists(manifest_path)):
+            return [], None
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get('model') != self.model_key:
+            return [], None                    # other embedding space: re-embed everything
+        features = np.load(features_path, mmap_mode='r')
+        if len(features) != len(manifest['files']):
+            return [], None                    # torn/foreign cache: rebuild it
+        return manifest['files'], features
+
+    def user_features(self, user_name):
+        """Up-to-date (n_images, dim) features for one user (memory-mapped when unchanged)."""
+        with self.lock:
+            return self._update(user_name)
+
+    def _update(self, user_name):
+        current = self._scan(user_name)
+        files, features = self._load(user_name)
+
+        keep = [i for i, entry in enumerate(files) if current.get(entry['name']) == entry['stat']]
+        kept_names = {files[i]['name'] for i in keep}
+        new_names = sorted(name for name in current if name not in kept_names)
+        if not new_names and len(keep) == len(files) and features is not None:
+            return features
+
+        parts = [np.asarray(features[keep])] if keep else []
+        features = None                        # release the mmap before replacing the shard
+        user_dir = os.path.join(self.dataset_dir, user_name)
+        if new_names:
+            dataset = image_dataset([os.path.join(user_dir, name) for name in new_names])
+            parts.extend(np.asarray(self.embed_batch(batch), dtype=np.float32) for batch in dataset)
+        manifest = [files[i] for i in keep] + [{'name': name, 'stat': current[name]} for name in new_names]
+        if not manifest:
+            shutil.rmtree(self._paths(user_name)[0], ignore_errors=True)
+            return np.empty((0, 0), dtype=np.float32)
+
+        self._write(user_name, np.concatenate(parts).astype(np.float32), manifest)
+        return self._load(user_name)[1]
+
+    def _write(self, user_name, features, files):
+        shard_dir, features_path, manifest_path = self._paths(user_name)
+        os.makedirs(shard_dir, exist_ok=True)
+        with open(features_path + ".tmp", 'wb') as f:
+            np.save(f, features)
+        with open(manifest_path + ".tmp", 'w') as f:
+            json.dump({'model': self.model_key, 'files': files}, f)
+        os.replace(features_path + ".tmp", features_path)
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+    def drop(self, user_name):
+        with self.lock:
+            shutil.rmtree(self._paths(user_name)[0], ignore_errors=True)
@@ -0,0 +1,277 @@
+import sqlite3
+import numpy as np
+
+EMBEDDING_SIZE = 1280      # MobileNetV2 global-average-pooled features
+MATCH_THRESHOLD = 0.85     # default min cosine similarity to accept a match
+IVF_MIN_VECTORS = 50000    # switch 'auto' mode to IVF above this many gallery vectors
+
+
+def encode_embeddings(embeddings):
+    return np.asarray(embeddings, dtype=np.float32).tobytes()
+
+
+def decode_embeddings(blob):
+    return np.frombuffer(blob, dtype=np.float32).reshape(-1, EMBEDDING_SIZE)
+
+
+def normalize(x):
+    x = np.asarray(x, dtype=np.float32)
+    return x / np.maximum(np.linalg.norm(x, axis=-1, keepdims=True), 1e-12)
+
+
+def nearest_clusters(x, centroids, k):
+    sims = x @ centroids.T
+    k = min(k, sims.shape[1])
+    return np.argpartition(-sims, k - 1, axis=1)[:, :k]
+
+
+def train_ivf(vectors, nlist=None, iters=10, sample=50000, seed=0):
+    """
+    Spherical k-means coarse quantizer over (a sample of) `vectors`:
+    (centroids, cluster of every vector). Only reads `vectors`, so it can run
+    on a FaceIndex.snapshot() without holding the index lock.
+    """
+    n = len(vectors)
+    nlist = nlist or int(np.clip(np.sqrt(n), 1, 1024))
+    rng = np.random.default_rng(seed)
+    train = vectors[np.sort(rng.choice(n, size=min(n, sample), replace=False))]
+    centroids = train[rng.choice(len(train), size=min(nlist, len(train)), replace=False)].copy()
+    for _ in range(iters):
+        labels = np.argmax(train @ centroids.T, axis=1)
+        order = np.argsort(labels, kind='stable')
+        present, starts = np.unique(labels[order], return_index=True)
+        sums = centroids.copy()            # empty clusters stay where they were
+        sums[present] = np.add.reduceat(train[order], starts, axis=0)
+        centroids = normalize(sums)
+    return centroids, nearest_clusters(vectors, centroids, 1)[:, 0]
+
+
+class FaceIndex:
+    """
+    Gallery of enrolled face embeddings for cosine top-k search.
+
+    All vectors live in one contiguous (N, EMBEDDING_SIZE) float32 matrix,
+    L2-normalised and grouped by user, so a batch of queries is scored with a
+    single matmul and reduced to one score per user with `maximum.reduceat`.
+
+    mode='exact' scans every vector. mode='ivf' clusters the gallery with
+    spherical k-means and only scores vectors in the `nprobe` clusters closest
+    to each query — for galleries of tens of thousands of users. mode='auto'
+    picks IVF once the gallery has IVF_MIN_VECTORS vectors.
+
+    The matrix is the first rows of a buffer that doubles when full, so
+    enrolling a user appends in amortised O(their vectors) rather than
+    copying the gallery. `add()` never trains IVF itself: for a live index
+    the caller checks `ivf_due()`, trains on a `snapshot()` off-lock and
+    hands the result to `install_ivf()`. Rows of a snapshot are never
+    written again (removal reallocates), so reading them off-lock is safe.
+    """
+    def __init__(self, dim=EMBEDDING_SIZE, mode='auto', nprobe=8):
+        self.dim = dim
+        self.mode = mode
+        self.nprobe = nprobe
+        self._buffer = np.empty((0, dim), dtype=np.float32)
+        self._size = 0
+        self._generation = 0                   # bumped whenever existing rows move
+        self.user_ids = []                     # one entry per user, in matrix order
+        self.names = {}                        # user_id -> name
+        self.thresholds = {}                   # user_id -> min cosine similarity
+        self.counts = np.empty(0, dtype=np.int64)
+        self.centroids = None                  # (nlist, dim) when IVF is built
+        self.assign = None                     # (N,) cluster of every vector
+        self._lists = None                     # inverted lists, rebuilt lazily after changes
+        self._trained_on = 0
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    @property
+    def vectors(self):
+        return self._buffer[:self._size]
+
+    @vectors.setter
+    def vectors(self, value):
+        self._buffer = np.ascontiguousarray(value, dtype=np.float32)
+        self._size = len(self._buffer)
+        self._generation += 1
+
+    # ---------- Maintenance ----------
+    @classmethod
+    def from_embeddings(cls, users, **kwargs):
+        """
+        Build an index in one pass from (user_id, name, embeddings, threshold)
+        rows, training IVF once at the end if the mode calls for it.
+        """
+        index = cls(**kwargs)
+        users = [u for u in users if len(u[2])]
+        if users:
+            index.vectors = normalize(np.concatenate(
+                [np.asarray(u[2], dtype=np.float32).reshape(-1, index.dim) for u in users]))
+            index.user_ids = [u[0] for u in users]
+            index.names = {u[0]: u[1] for u in users}
+            index.thresholds = {u[0]: float(u[3]) for u in users if u[3] is not None}
+            index.counts = np.array([len(u[2]) for u in users], dtype=np.int64)
+            index._maybe_build_ivf()
+        return index
+
+    @classmethod
+    def from_db(cls, db_path='attendance.db', **kwargs):
+        conn = sqlite3.connect(db_path)
+        c = conn.cursor()
+        c.execute("SELECT id, name, face_encoding, match_threshold FROM users "
+                  "WHERE length(face_encoding) > 0 ORDER BY id")
+        rows = c.fetchall()
+        conn.close()
+        return cls.from_embeddings([(r[0], r[1], decode_embeddings(r[2]), r[3]) for r in rows], **kwargs)
+
+    def _append(self, rows):
+        end = self._size + len(rows)
+        if end > len(self._buffer):
+            grown = np.empty((max(end, 2 * len(self._buffer), 64), self.dim), dtype=np.float32)
+            grown[:self._size] = self._buffer[:self._size]
+            self._buffer = grown
+        self._buffer[self._size:end] = rows
+        self._size = end
+
+    def add(self, user_id, name, embeddings, threshold=None):
+        """Add (or replace) one user's embeddings; keeps their threshold unless given."""
+        if threshold is None:
+            threshold = self.thresholds.get(user_id)
+        self.remove(user_id)
+        embeddings = normalize(embeddings).reshape(-1, self.dim)
+        if not len(embeddings):
+            return
+        self._append(embeddings)
+        self.user_ids.append(user_id)
+        self.names[user_id] = name
+        if threshold is not None:
+            self.thresholds[user_id] = threshold
+        self.counts = np.append(self.counts, len(embeddings))
+        if self.centroids is not None:
+            self.assign = np.concatenate([self.assign, self._nearest_clusters(embeddings, 1)[:, 0]])
+        self._lists = None
+
+    def remove(self, user_id):
+        if user_id not in self.names:
+            return
+        pos = self.user_ids.index(user_id)
+        start = int(self.counts[:pos].sum())
+        stop = start + int(self.counts[pos])
+        # a new buffer rather than shifting rows in place: snapshots stay valid
+        self.vectors = np.delete(self.vectors, np.s_[start:stop], axis=0)
+        if self.assign is not None:
+            self.assign = np.delete(self.assign, np.s_[start:stop])
+        self._lists = None
+        del self.user_ids[pos]
+        self.counts = np.delete(self.counts, pos)
+        self.names.pop(user_id)
+        self.thresholds.pop(user_id, None)
+
+    def set_threshold(self, user_id, threshold):
+        if threshold is None:
+            self.thresholds.pop(user_id, None)
+        else:
+            self.thresholds[user_id] = float(threshold)
+
+    def threshold(self, user_id):
+        return self.thresholds.get(user_id, MATCH_THRESHOLD)
+
+    # ---------- IVF ----------
+    def ivf_due(self):
+        """True when IVF should be (re)trained: first needed, or the gallery doubled since."""
+        n = self._size
+        wants_ivf = self.mode == 'ivf' or (self.mode == 'auto' and n >= IVF_MIN_VECTORS)
+        return wants_ivf and n > 0 and (self.centroids is None or n >= 2 * self._trained_on)
+
+    def _maybe_build_ivf(self):
+        # for indexes nobody else can see yet (from_embeddings); live ones use snapshot/install
+        n = self._size
+        if not (self.mode == 'ivf' or (self.mode == 'auto' and n >= IVF_MIN_VECTORS)) or n == 0:
+            self.centroids = self.assign = None
+        elif self.ivf_due():
+            self.build_ivf()
+
+    def snapshot(self):
+        """(vectors, generation) to train IVF on without the lock; see install_ivf."""
+        return self.vectors, self._generation
+
+    def install_ivf(self, trained, snapshot):
+        """Use centroids trained on `snapshot`, assigning rows added since (or all, if rows moved)."""
+        centroids, assign = trained
+        vectors, generation = snapshot
+        if generation == self._generation:
+            assign = np.concatenate([assign, nearest_clusters(self.vectors[len(vectors):], centroids, 1)[:, 0]])
+        else:
+            assign = nearest_clusters(self.vectors, centroids, 1)[:, 0]
+        self.centroids = centroids
+        self.assign = assign
+        self._lists = None
+        self._trained_on = len(vectors)
+
+    def build_ivf(self, nlist=None, iters=10, sample=50000, seed=0):
+        """Train and install IVF in one go (the caller holds whatever lock guards the index)."""
+        snapshot = self.snapshot()
+        self.install_ivf(train_ivf(snapshot[0], nlist, iters, sample, seed), snapshot)
+
+    def _inverted_lists(self):
+        """(vector order sorted by cluster, start offset of every cluster + end)."""
+        if self._lists is None:
+            order = np.argsort(self.assign, kind='stable')
+            bounds = np.searchsorted(self.assign[order], np.arange(len(self.centroids) + 1))
+            self._lists = (order, bounds)
+        return self._lists
+
+    def _nearest_clusters(self, x, k):
+        return nearest_clusters(x, self.centroids, k)
+
+    # ---------- Search ----------
+    def search(self, queries, k=1):
+        """
+        Top-k users for each query embedding.
+
+        Returns (user_ids, scores), both (n_queries, k): best cosine similarity
+        per user, highest first. Missing slots have user_id None and score 0.
+        """
+        queries = normalize(queries).reshape(-1, self.dim)
+        n_q, n_users = len(queries), len(self.user_ids)
+        out_ids = np.full((n_q, k), None, dtype=object)
+        out_scores = np.zeros((n_q, k), dtype=np.float32)
+        if n_users == 0 or n_q == 0:
+            return out_ids, out_scores
+
+        if self.centroids is None:
+            sims = queries @ self.vectors.T                                   # (q, N)
+            starts = np.concatenate([[0], np.cumsum(self.counts)[:-1]])
+            per_user = np.maximum.reduceat(sims, starts, axis=1)              # (q, users)
+        else:
+            per_user = np.full((n_q, n_users), -np.inf, dtype=np.float32)
+            owner = np.repeat(np.arange(n_users), self.counts)
+            order, bounds = self._inverted_lists()
+            probes = self._nearest_clusters(queries, self.nprobe)
+            for qi in range(n_q):
+                cand = np.concatenate([order[bounds[p]:bounds[p + 1]] for p in probes[qi]])
+                np.maximum.at(per_user[qi], owner[cand], self.vectors[cand] @ queries[qi])
+
+        k_eff = min(k, n_users)
+        top = np.argpartition(-per_user, k_eff - 1, axis=1)[:, :k_eff]
+        top_scores = np.take_along_axis(per_user, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        ids = np.array(self.user_ids, dtype=object)
+        valid = np.isfinite(top_scores)
+        out_ids[:, :k_eff] = np.where(valid, ids[top], None)
+        out_scores[:, :k_eff] = np.where(valid, top_scores, 0)
+        return out_ids, out_scores
+
+    def match(self, queries):
+        """Best user per query, or None when below that user's threshold: [(user_id, name, score)]."""
+        ids, scores = self.search(queries, k=1)
+        results = []
+        for user_id, score in zip(ids[:, 0], scores[:, 0]):
+            if user_id is None or score < self.threshold(user_id):
+                results.append((None, "unknown", float(score)))
+            else:
+                results.append((user_id, self.names[user_id], float(score)))
+        return results
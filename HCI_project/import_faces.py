@@ -0,0 +1,166 @@
+# Bulk enrollment from photos instead of the webcam.
+#   python import_faces.py photos/ [--roster roster.csv] [--workers 8]
+# photos/<Full Name>/*.jpg -> faces/<Full Name>/ (face crops) + a users row each.
+# roster.csv (name,email) supplies emails; otherwise <name>@<--email-domain> is used.
+# Detection/cropping runs in a process pool; at the end a single 'rebuild' job is
+# queued, which the running app (or the next start) turns into the new gallery:
+# only the new photos are embedded (the rest come from the feature cache) and
+# the index is built in one pass, so its cost grows linearly with the roster.
+import argparse
+import csv
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+import summaries
+from db import ConnectionPool
+from face_cache import IMAGE_EXTS
+from jobs import JobQueue
+
+DATASET_DIR = "faces"
+FACE_SIZE = (224, 224)
+DETECT_MAX_SIDE = 640
+
+_detector = None
+
+
+def _init_worker():
+    global _detector
+    cv2.setNumThreads(1)                   # one process per core already
+    _detector = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+
+
+def crop_face(task):
+    """(user name, source path, output dir) -> (user name, status); keeps the largest face."""
+    name, src, out_dir = task
+    image = cv2.imread(src)
+    if image is None:
+        return name, 'unreadable'
+    # detect on a downscaled copy (photos are often several megapixels), crop at full size
+    scale = min(1.0, DETECT_MAX_SIDE / max(image.shape[:2]))
+    gray = cv2.cvtColor(cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+                        if scale < 1.0 else image, cv2.COLOR_BGR2GRAY)
+    faces = _detector.detectMultiScale(gray, 1.1, 5)
+    if len(faces) == 0:
+        return name, 'no_face'
+    x, y, w, h = (int(v / scale) for v in max(faces, key=lambda f: f[2] * f[3]))
+    # named after the source photo, so importing the same folder again overwrites
+    digest = hashlib.sha1(os.path.abspath(src).encode('utf-8')).hexdigest()
+    os.makedirs(out_dir, exist_ok=True)    # only once there is a crop: no empty faces/<name>
+    cv2.imwrite(os.path.join(out_dir, f"import_{digest}.jpg"),
+                cv2.resize(image[y:y+h, x:x+w], FACE_SIZE))
+    return name, 'ok'
+
+
+def load_roster(path):
+    if not path:
+        return {}
+    with open(path, newline='', encoding='utf-8') as f:
+        return {row['name'].strip(): row['email'].strip() for row in csv.DictReader(f)}
+
+
+def plan_users(pool, names, roster, email_domain):
+    """
+    Before anything is cropped: the users row behind every name. An existing
+    user with that name is reused; otherwise a new row gets the roster email
+    (or one derived from the name). A person whose email is already taken by
+    another user, or by someone earlier in this import, is skipped.
+    Returns ({name: existing id or None}, {name: email of a new row}, {name: reason skipped}).
+    """
+    existing, emails, skipped = {}, {}, {}
+    with pool.connection() as conn:
+        for name in names:
+            row = conn.execute("SELECT id FROM users WHERE name = ?", (name,)).fetchone()
+            if row is not None:
+                existing[name] = row[0]
+                continue
+            email = roster.get(name) or f"{re.sub(r'[^a-z0-9]+', '.', name.lower()).strip('.')}@{email_domain}"
+            taken = conn.execute("SELECT name FROM users WHERE email = ?", (email,)).fetchone()
+            other = next((n for n, e in emails.items() if e == email), None)
+            if taken is not None or other is not None:
+                skipped[name] = f"email {email} already used by {taken[0] if taken else other}"
+            else:
+                existing[name] = None
+                emails[name] = email
+    return existing, emails, skipped
+
+
+def register_users(pool, names, existing, emails):
+    """Insert the planned new rows; (name -> id, name -> reason skipped) for `names`."""
+    ids, skipped = {}, {}
+    with pool.connection() as conn:
+        for name in names:
+            if existing[name] is not None:
+                ids[name] = existing[name]
+                continue
+            try:
+                ids[name] = conn.execute("INSERT INTO users (name, email) VALUES (?, ?)",
+                                         (name, emails[name])).lastrowid
+            except sqlite3.IntegrityError:     # added by someone else since plan_users
+                skipped[name] = f"email {emails[name]} already used"
+        conn.commit()
+    return ids, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('photos', help="directory with one sub-directory of photos per person")
+    parser.add_argument('--roster', help="CSV with name,email columns")
+    parser.add_argument('--email-domain', default='import.local')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--db', default=os.environ.get('ATTENDANCE_DB', 'attendance.db'))
+    parser.add_argument('--dataset', default=DATASET_DIR)
+    args = parser.parse_args()
+
+    pool = ConnectionPool(args.db)
+    with pool.connection() as conn:
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'face_image_counts'").fetchone() is None:
+            sys.exit(f"{args.db} has no schema yet; start the app once to create it")
+
+    people = sorted(name for name in os.listdir(args.photos) if os.path.isdir(os.path.join(args.photos, name)))
+    existing, emails, skipped = plan_users(pool, people, load_roster(args.roster), args.email_domain)
+    tasks = []
+    for name in people:
+        if name in skipped:
+            continue
+        src_dir = os.path.join(args.photos, name)
+        tasks += [(name, os.path.join(src_dir, f), os.path.join(args.dataset, name))
+                  for f in sorted(os.listdir(src_dir)) if f.lower().endswith(IMAGE_EXTS)]
+    for name, reason in skipped.items():
+        print(f"⚠️ Skipping {name}: {reason}")
+    if not tasks:
+        sys.exit(f"No images to import under {args.photos}/<name>/")
+
+    started = time.perf_counter()
+    stats = {}
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as executor:
+        for name, status in executor.map(crop_face, tasks, chunksize=16):
+            stats.setdefault(name, {'ok': 0, 'no_face': 0, 'unreadable': 0})[status] += 1
+    elapsed = time.perf_counter() - started
+
+    enrolled = sorted(name for name, s in stats.items() if s['ok'])
+    ids, late = register_users(pool, enrolled, existing, emails)
+    for name, reason in late.items():
+        print(f"⚠️ Not enrolled {name}: {reason} (crops kept in {os.path.join(args.dataset, name)})")
+    enrolled = [name for name in enrolled if name in ids]
+    with pool.connection() as conn:
+        for name in enrolled:
+            summaries.set_face_images(conn, ids[name], summaries.count_face_images(os.path.join(args.dataset, name)))
+        conn.commit()
+    job_id = JobQueue({}, pool).submit('rebuild') if enrolled else None
+
+    for name, s in sorted(stats.items()):
+        print(f"{name:<30} {s['ok']:>5} cropped {s['no_face']:>4} no face {s['unreadable']:>4} unreadable")
+    print(f"{len(tasks)} images from {len(stats)} people in {elapsed:.1f}s "
+          f"({len(tasks) / elapsed:.1f} images/s, {args.workers} workers)")
+    print(f"{len(enrolled)} users enrolled" + (f"; gallery rebuild queued as job #{job_id}" if job_id else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import threading
+import traceback
+
+JOB_KINDS = ('enroll', 'rebuild')
+
+
+def init_jobs_table(c):
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL CHECK(kind IN ('enroll', 'rebuild')),
+        user_id INTEGER,
+        status TEXT NOT NULL DEFAULT 'pending'
+            CHECK(status IN ('pending', 'running', 'done', 'failed', 'coalesced')),
+        merged_into INTEGER,
+        message TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        started_at TIMESTAMP,
+        finished_at TIMESTAMP
+    )''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, kind, user_id)")
+
+
+class JobQueue:
+    """
+    Persistent background queue for gallery updates, backed by the jobs table.
+
+    A single daemon thread runs one job at a time. Requests that arrive while
+    an equivalent job is still pending are coalesced into it: a second enroll
+    for the same user returns the pending job, and a rebuild absorbs every
+    pending enroll (marked 'coalesced', merged_into = the rebuild). Jobs left
+    'running' by a crash are picked up again on start().
+
+    `handlers` maps job kind -> callable(user_id) raising on failure; `pool`
+    is the app's db.ConnectionPool.
+    """
+    def __init__(self, handlers, pool):
+        self.handlers = handlers
+        self.pool = pool
+        self.wakeup = threading.Event()
+        self.submit_lock = threading.Lock()
+        self.thread = None
+
+    def start(self):
+        if self.thread is not None:
+            return
+        with self.pool.connection() as conn:
+            conn.execute("UPDATE jobs SET status = 'pending', started_at = NULL WHERE status = 'running'")
+            conn.commit()
+        self.thread = threading.Thread(target=self._run, name='job-worker', daemon=True)
+        self.thread.start()
+        self.wakeup.set()
+
+    # ---------- Producer side ----------
+    def submit(self, kind, user_id=None):
+        """Queue a job (or join an equivalent pending one); returns the job id."""
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        with self.submit_lock, self.pool.connection() as conn:
+            c = conn.cursor()
+            # a pending rebuild already covers every user
+            c.execute("SELECT id FROM jobs WHERE status = 'pending' AND kind = 'rebuild' ORDER BY id LIMIT 1")
+            row = c.fetchone()
+            if row is None and kind == 'enroll':
+                c.execute("SELECT id FROM jobs WHERE status = 'pending' AND kind = 'enroll' AND user_id = ? "
+                          "ORDER BY id LIMIT 1", (user_id,))
+                row = c.fetchone()
+            if row is not None:
+                return row['id']
+
+            c.execute("INSERT INTO jobs (kind, user_id) VALUES (?, ?)", (kind, user_id))
+            job_id = c.lastrowid
+            if kind == 'rebuild':
+                c.execute("UPDATE jobs SET status = 'coalesced', merged_into = ?, finished_at = CURRENT_TIMESTAMP "
+                          "WHERE status = 'pending' AND kind = 'enroll'", (job_id,))
+            conn.commit()
+        self.wakeup.set()
+        return job_id
+
+    def get(self, job_id):
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    # ---------- Worker side ----------
+    def _claim_next(self):
+        with self.pool.connection() as conn:
+            c = conn.cursor()
+            c.execute("SELECT * FROM jobs WHERE status = 'pending' ORDER BY id LIMIT 1")
+            job = c.fetchone()
+            if job is not None:
+                # guarded update: another process (e.g. the debug reloader) may race us
+                c.execute("UPDATE jobs SET status = 'running', started_at = CURRENT_TIMESTAMP "
+                          "WHERE id = ? AND status = 'pending'", (job['id'],))
+                if c.rowcount == 0:
+                    job = None
+            conn.commit()
+        return dict(job) if job else None
+
+    def _finish(self, job_id, status, message=None):
+        with self.pool.connection() as conn:
+            conn.execute("UPDATE jobs SET status = ?, message = ?, finished_at = CURRENT_TIMESTAMP WHERE id = ?",
+                         (status, message, job_id))
+            conn.commit()
+
+    def _run(self):
+        while True:
+            self.wakeup.wait(timeout=5)
+            self.wakeup.clear()
+            while True:
+                job = self._claim_next()
+                if job is None:
+                    break
+                print(f"[INFO] Job #{job['id']} ({job['kind']}) started.")
+                try:
+                    message = self.handlers[job['kind']](job['user_id'])
+                    self._finish(job['id'], 'done', message)
+                    print(f"[INFO] Job #{job['id']} done.")
+                except Exception as e:
+                    traceback.print_exc()
+                    self._finish(job['id'], 'failed', str(e))
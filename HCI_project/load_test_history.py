@@ -0,0 +1,100 @@
+# Load test for attendance history: fills a scratch database with a year of
+# synthetic check-ins, then times /history pages through the Flask test client.
+#   python load_test_history.py [--users 400] [--days 365] [--requests 50]
+# The real attendance.db is never touched (ATTENDANCE_DB points at a temp file).
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+LEGACY_SQL = ("SELECT a.id, u.name, a.log_type, a.timestamp FROM attendance_logs a "
+              "JOIN users u ON a.user_id = u.id ORDER BY a.timestamp DESC")
+
+
+def synthetic_logs(n_users, days, rng):
+    """IN around 08:00-09:30 and OUT around 16:30-18:30 on weekdays, ~5% absences."""
+    start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days)
+    for day in range(days):
+        date = start + timedelta(days=day)
+        if date.weekday() >= 5:
+            continue
+        for user_id in range(1, n_users + 1):
+            if rng.random() < 0.05:
+                continue
+            clock_in = date + timedelta(minutes=480 + rng.randint(0, 90), seconds=rng.randint(0, 59))
+            clock_out = date + timedelta(minutes=990 + rng.randint(0, 120), seconds=rng.randint(0, 59))
+            yield user_id, 'IN', clock_in.strftime('%Y-%m-%d %H:%M:%S')
+            yield user_id, 'OUT', clock_out.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def timed(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(0.95 * (len(samples) - 1))], samples[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=400)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='attendance-load-'), 'attendance.db')
+    os.environ['ATTENDANCE_DB'] = db_path
+    import app                                         # creates the schema and indexes in db_path
+    app.face_model.ready.wait(timeout=120)             # keep model warm-up out of the timings
+
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT INTO users (name, email) VALUES (?, ?)",
+                     [(f"user{i}", f"user{i}@example.com") for i in range(1, args.users + 1)])
+    started = time.perf_counter()
+    conn.executemany("INSERT INTO attendance_logs (user_id, log_type, timestamp) VALUES (?, ?, ?)",
+                     synthetic_logs(args.users, args.days, rng))
+    conn.commit()
+    n_logs = conn.execute("SELECT COUNT(*) FROM attendance_logs").fetchone()[0]
+    conn.execute("ANALYZE")
+    print(f"{n_logs} logs for {args.users} users over {args.days} days "
+          f"inserted in {time.perf_counter() - started:.1f}s ({db_path})")
+
+    client = app.app.test_client()
+    some_day = conn.execute("SELECT date(timestamp) FROM attendance_logs ORDER BY id LIMIT 1 OFFSET ?",
+                            (n_logs // 2,)).fetchone()[0]
+
+    def deep_page():
+        # walk 20 pages back through the keyset cursor, time only the last one
+        cursor = {}
+        for _ in range(20):
+            cursor = client.get('/api/history', query_string=cursor).get_json()['next']
+        return cursor
+
+    deep_cursor = deep_page()
+    cases = [
+        ("first page", lambda: client.get('/history')),
+        ("user filter", lambda: client.get('/history', query_string={'user_id': rng.randint(1, args.users)})),
+        ("date filter", lambda: client.get('/history', query_string={'date': some_day})),
+        ("page 21 (keyset)", lambda: client.get('/history', query_string=deep_cursor)),
+        ("json api", lambda: client.get('/api/history')),
+        ("legacy full scan", lambda: conn.execute(LEGACY_SQL).fetchall()),
+    ]
+    print(f"{'case':<18} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for name, fn in cases:
+        fn()                                           # warm-up
+        repeats = 5 if name == "legacy full scan" else args.requests
+        p50, p95, worst = timed(fn, repeats)
+        print(f"{name:<18} {p50:>8.2f} {p95:>8.2f} {worst:>8.2f}")
+    conn.close()
+    app.camera.close()
+
+
+if __name__ == "__main__":
+    main()
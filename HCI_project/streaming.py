@@ -0,0 +1,176 @@
+import asyncio
+import threading
+import time
+
+import cv2
+
+JPEG_QUALITY = 80
+BOUNDARY = b'frame'
+
+
+def mjpeg_part(jpeg):
+    return b'--' + BOUNDARY + b'\r\nContent-Type: image/jpeg\r\n\r\n' + jpeg + b'\r\n'
+
+
+class FrameBroadcaster:
+    """
+    Annotate and JPEG-encode each camera frame once, for every viewer.
+
+    A single producer thread runs while at least one viewer is subscribed:
+    it takes the next camera frame, passes it through `annotate(frame)`,
+    encodes it and publishes the bytes. Viewers only ever read the newest
+    published frame, so a slow viewer skips frames instead of queueing them
+    (drop-old-frames) and never slows the others down.
+
+    Flask viewers use `frames()` (blocking generator); asyncio viewers use
+    `subscribe()` (async generator), which is woken from the producer thread.
+    """
+    def __init__(self, camera, annotate, quality=JPEG_QUALITY):
+        self.camera = camera
+        self.annotate = annotate
+        self.params = [int(cv2.IMWRITE_JPEG_QUALITY), quality]
+        self.cond = threading.Condition()
+        self.seq = 0
+        self.jpeg = None
+        self.viewers = 0
+        self.async_waiters = set()             # (loop, asyncio.Event) per async viewer
+        self.thread = None
+        self.closed = False
+        self.stats = {'encoded': 0, 'started': time.monotonic()}
+
+    # ---------- Producer ----------
+    def _attach(self):
+        with self.cond:
+            self.viewers += 1
+            if self.thread is None and not self.closed:
+                self.thread = threading.Thread(target=self._run, name='mjpeg-encoder', daemon=True)
+                self.thread.start()
+
+    def _detach(self):
+        with self.cond:
+            self.viewers -= 1
+
+    def _run(self):
+        try:
+            camera_seq = 0
+            while True:
+                with self.cond:
+                    if self.viewers == 0 or self.closed:
+                        self.thread = None     # same lock as the check: _attach starts a new one
+                        return
+                seq, frame = self.camera.wait_next(camera_seq)
+                if frame is None:
+                    continue                   # camera (re)opening; Camera.error says why
+                camera_seq = seq
+                ok, buffer = cv2.imencode('.jpg', self.annotate(frame.copy()), self.params)
+                if not ok:
+                    continue
+                with self.cond:
+                    self.seq += 1
+                    self.jpeg = buffer.tobytes()
+                    self.stats['encoded'] += 1
+                    self.cond.notify_all()
+                    waiters = list(self.async_waiters)
+                for loop, event in waiters:
+                    loop.call_soon_threadsafe(event.set)
+        finally:
+            # also on a crash (e.g. in annotate), so the next viewer starts a fresh thread
+            with self.cond:
+                if self.thread is threading.current_thread():
+                    self.thread = None
+
+    def close(self):
+        """Stop the encoder thread (at shutdown, before the camera is closed)."""
+        with self.cond:
+            self.closed = True
+            thread = self.thread
+        if thread is not None:
+            thread.join(timeout=5.0)
+
+    # ---------- Viewers ----------
+    def frames(self, timeout=5.0):
+        """Blocking generator of JPEG bytes, newest frame each time; ends if the camera stalls."""
+        self._attach()
+        try:
+            seq = 0
+            while True:
+                with self.cond:
+                    if not self.cond.wait_for(lambda: self.seq > seq, timeout=timeout):
+                        return
+                    seq, jpeg = self.seq, self.jpeg
+                yield jpeg
+        finally:
+            self._detach()
+
+    async def subscribe(self):
+        """Async generator of JPEG bytes for one asyncio viewer (newest frame each time)."""
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self.cond:
+            self.async_waiters.add(waiter)
+        self._attach()
+        try:
+            seq = 0
+            while True:
+                await waiter[1].wait()
+                waiter[1].clear()
+                with self.cond:
+                    if self.seq == seq:
+                        continue
+                    seq, jpeg = self.seq, self.jpeg
+                yield jpeg
+        finally:
+            with self.cond:
+                self.async_waiters.discard(waiter)
+            self._detach()
+
+
+class MJPEGServer:
+    """
+    Minimal asyncio HTTP server for GET /video_feed (multipart MJPEG).
+
+    One coroutine per viewer instead of one server thread: each writes the
+    broadcaster's newest frame and awaits `drain()`, so a viewer on a slow
+    link applies backpressure only to itself and simply receives fewer frames.
+    """
+    def __init__(self, broadcaster, host='0.0.0.0', port=5001):
+        self.broadcaster = broadcaster
+        self.host = host
+        self.port = port
+        self.clients = 0
+
+    async def _handle(self, reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), timeout=10)
+            method, path = request.split(b' ', 2)[:2]
+            if method != b'GET' or path.split(b'?')[0] != b'/video_feed':
+                writer.write(b'HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+                await writer.drain()
+                return
+            writer.write(b'HTTP/1.1 200 OK\r\n'
+                         b'Content-Type: multipart/x-mixed-replace; boundary=' + BOUNDARY + b'\r\n'
+                         b'Cache-Control: no-cache, no-store\r\n'
+                         b'Access-Control-Allow-Origin: *\r\n'
+                         b'Connection: close\r\n\r\n')
+            self.clients += 1
+            try:
+                async for jpeg in self.broadcaster.subscribe():
+                    writer.write(mjpeg_part(jpeg))
+                    await writer.drain()
+            finally:
+                self.clients -= 1
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError,
+                ConnectionError, ValueError):
+            pass                               # client went away or sent garbage
+        finally:
+            writer.close()
+
+    async def serve(self):
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        async with server:
+            await server.serve_forever()
+
+    def serve_in_thread(self):
+        """Run the server on its own event loop in a daemon thread (next to Flask)."""
+        thread = threading.Thread(target=lambda: asyncio.run(self.serve()), name='mjpeg-server', daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,115 @@
+import os
+
+from face_cache import IMAGE_EXTS
+
+
+def init_summary_tables(c, dataset_dir="faces"):
+    """
+    Create the reporting tables; on first creation fill them from the raw
+    attendance_logs and the faces/ folders (once, later updates are incremental).
+
+    attendance_daily   one row per user and (UTC) day: first IN, last OUT and
+                       hours between them. Upserts only take MIN/MAX, so
+                       applying the same event twice changes nothing.
+    face_image_counts  number of enrolled face images per user.
+    """
+    existing = {row[0] for row in c.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS attendance_daily (
+        user_id INTEGER NOT NULL,
+        day TEXT NOT NULL,
+        first_in TIMESTAMP,
+        last_out TIMESTAMP,
+        hours REAL,
+        PRIMARY KEY (user_id, day)
+    ) WITHOUT ROWID''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_attendance_daily_day ON attendance_daily (day, user_id)")
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS face_image_counts (
+        user_id INTEGER PRIMARY KEY,
+        images INTEGER NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''')
+    if 'attendance_daily' not in existing:
+        rebuild_daily(c)
+    if 'face_image_counts' not in existing:
+        for user_id, name in c.execute("SELECT id, name FROM users").fetchall():
+            set_face_images(c, user_id, count_face_images(os.path.join(dataset_dir, name)))
+
+
+def rebuild_daily(c):
+    c.execute("DELETE FROM attendance_daily")
+    c.execute('''
+    INSERT INTO attendance_daily (user_id, day, first_in, last_out)
+    SELECT user_id, date(timestamp),
+           MIN(CASE WHEN log_type = 'IN' THEN timestamp END),
+           MAX(CASE WHEN log_type = 'OUT' THEN timestamp END)
+    FROM attendance_logs
+    GROUP BY user_id, date(timestamp)''')
+    c.execute(f"UPDATE attendance_daily SET hours = {_HOURS}")
+
+
+# hours between first IN and last OUT, NULL until both exist (or if OUT precedes IN)
+_HOURS = ("CASE WHEN first_in IS NOT NULL AND last_out > first_in "
+          "THEN round((julianday(last_out) - julianday(first_in)) * 24, 4) END")
+
+
+def record_events(c, events):
+    """Fold check-in events (dicts with user_id, log_type, timestamp) into attendance_daily."""
+    c.executemany('''
+    INSERT INTO attendance_daily (user_id, day, first_in, last_out)
+    VALUES (:user_id, date(:timestamp),
+            CASE WHEN :log_type = 'IN' THEN :timestamp END,
+            CASE WHEN :log_type = 'OUT' THEN :timestamp END)
+    ON CONFLICT (user_id, day) DO UPDATE SET
+        first_in = CASE WHEN first_in IS NULL OR excluded.first_in < first_in
+                        THEN coalesce(excluded.first_in, first_in) ELSE first_in END,
+        last_out = CASE WHEN last_out IS NULL OR excluded.last_out > last_out
+                        THEN coalesce(excluded.last_out, last_out) ELSE last_out END''', events)
+    days = {(e['user_id'], e['timestamp'][:10]) for e in events}
+    c.executemany(f"UPDATE attendance_daily SET hours = {_HOURS} WHERE user_id = ? AND day = ?", days)
+
+
+def count_face_images(user_dir):
+    if not os.path.isdir(user_dir):
+        return 0
+    return sum(1 for entry in os.scandir(user_dir)
+               if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTS))
+
+
+def set_face_images(c, user_id, images):
+    c.execute("INSERT INTO face_image_counts (user_id, images) VALUES (?, ?) "
+              "ON CONFLICT (user_id) DO UPDATE SET images = excluded.images, updated_at = CURRENT_TIMESTAMP",
+              (user_id, images))
+
+
+def drop_user(c, user_id):
+    c.execute("DELETE FROM attendance_daily WHERE user_id = ?", (user_id,))
+    c.execute("DELETE FROM face_image_counts WHERE user_id = ?", (user_id,))
+
+
+def attendance_report(c, start, end, user_id=None, detail=False):
+    """
+    Per-user totals for start..end (inclusive 'YYYY-MM-DD' days), read only
+    from attendance_daily; with `detail` each user also gets their daily rows.
+    """
+    where, params = "d.day BETWEEN ? AND ?", [start, end]
+    if user_id is not None:
+        where += " AND d.user_id = ?"
+        params.append(user_id)
+    rows = c.execute(f'''
+    SELECT d.user_id, u.name, COUNT(*) AS days_present, round(coalesce(SUM(d.hours), 0), 2) AS hours,
+           round(AVG(d.hours), 2) AS avg_hours, MIN(d.day) AS first_day, MAX(d.day) AS last_day
+    FROM attendance_daily d JOIN users u ON u.id = d.user_id
+    WHERE {where}
+    GROUP BY d.user_id ORDER BY u.name''', params).fetchall()
+    users = [dict(row) for row in rows]
+    if detail:
+        days = {}
+        for row in c.execute(f"SELECT d.user_id, d.day, d.first_in, d.last_out, d.hours "
+                             f"FROM attendance_daily d WHERE {where} ORDER BY d.day", params):
+            days.setdefault(row['user_id'], []).append(
+                {'day': row['day'], 'first_in': row['first_in'], 'last_out': row['last_out'], 'hours': row['hours']})
+        for user in users:
+            user['days'] = days.get(user['user_id'], [])
+    return users
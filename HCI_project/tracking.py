@@ -0,0 +1,148 @@
+import itertools
+
+import cv2
+
+DETECT_EVERY = 5           # run the Haar detector every N frames (or sooner if a track is lost)
+TRACK_SCALE = 0.5          # template matching runs on a downscaled grayscale frame
+TRACK_MIN_SCORE = 0.55     # normalised correlation below this = track lost
+SEARCH_MARGIN = 0.5        # search window = box grown by this fraction on each side
+IOU_MATCH = 0.3            # detection <-> track association threshold
+CONFIDENCE_DECAY = 0.97    # per-frame decay of a cached identity's confidence
+REFRESH_BELOW = 0.6        # re-run recognition once the decayed confidence falls below this
+
+
+def iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    return inter / union if union else 0.0
+
+
+class Track:
+    __slots__ = ('id', 'box', 'template', 'name', 'score', 'confidence', 'lost')
+
+    def __init__(self, track_id, box):
+        self.id = track_id
+        self.box = tuple(int(v) for v in box)
+        self.template = None
+        self.name = None           # None = not recognised yet
+        self.score = 0.0           # raw similarity from the last recognition
+        self.confidence = 0.0      # score decayed since that recognition
+        self.lost = False
+
+
+class FaceTracker:
+    """
+    Detect every `detect_every` frames, track in between, recognise rarely.
+
+    Detection (Haar) runs on frame 0, every `detect_every` frames, and on the
+    next frame after any track is lost. Between detections each box is carried
+    forward by template matching in a small search window. A track's identity
+    is cached with a confidence that decays every frame; recognition only runs
+    for new tracks and for tracks whose confidence fell below REFRESH_BELOW.
+    """
+    def __init__(self, face_model, detect_every=DETECT_EVERY):
+        self.face_model = face_model
+        self.detect_every = max(1, detect_every)
+        self.tracks = []
+        self.frame_index = 0
+        self.force_detect = True
+        self.ids = itertools.count(1)
+        self.stats = {'frames': 0, 'detections': 0, 'recognitions': 0}
+
+    def _small_gray(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, None, fx=TRACK_SCALE, fy=TRACK_SCALE, interpolation=cv2.INTER_AREA)
+
+    def _set_template(self, track, small):
+        x, y, w, h = (int(v * TRACK_SCALE) for v in track.box)
+        track.template = small[y:y + h, x:x + w].copy()
+
+    def _follow(self, track, small):
+        """Move `track` to the best template match near its last position."""
+        th, tw = track.template.shape[:2]
+        if th < 4 or tw < 4:
+            track.lost = True
+            return
+        x, y, w, h = (int(v * TRACK_SCALE) for v in track.box)
+        mx, my = int(w * SEARCH_MARGIN), int(h * SEARCH_MARGIN)
+        x0, y0 = max(0, x - mx), max(0, y - my)
+        x1, y1 = min(small.shape[1], x + w + mx), min(small.shape[0], y + h + my)
+        window = small[y0:y1, x0:x1]
+        if window.shape[0] < th or window.shape[1] < tw:
+            track.lost = True
+            return
+        result = cv2.matchTemplate(window, track.template, cv2.TM_CCOEFF_NORMED)
+        _, best, _, (bx, by) = cv2.minMaxLoc(result)
+        if best < TRACK_MIN_SCORE:
+            track.lost = True
+            return
+        ox, oy, ow, oh = track.box
+        track.box = (int((x0 + bx) / TRACK_SCALE), int((y0 + by) / TRACK_SCALE), ow, oh)
+
+    def _detect(self, frame, small):
+        boxes = [tuple(int(v) for v in b) for b in self.face_model.detect_faces(frame)]
+        self.stats['detections'] += 1
+        matched = []
+        unmatched = list(self.tracks)
+        for box in boxes:
+            best = max(unmatched, key=lambda t: iou(t.box, box), default=None)
+            if best is not None and iou(best.box, box) >= IOU_MATCH:
+                unmatched.remove(best)
+                best.box, best.lost = box, False
+                matched.append(best)
+            else:
+                matched.append(Track(next(self.ids), box))
+        self.tracks = matched
+        for track in self.tracks:
+            self._set_template(track, small)
+
+    def _recognize(self, frame):
+        if not self.face_model.recognizer_ready:
+            return
+        pending, crops = [], []
+        for track in self.tracks:
+            if track.name is not None and track.confidence >= REFRESH_BELOW:
+                continue
+            x, y, w, h = track.box
+            face_img = frame[max(0, y):y + h, max(0, x):x + w]
+            if face_img.size:
+                pending.append(track)
+                crops.append(face_img)
+        if not pending:
+            return
+        for track, (name, score) in zip(pending, self.face_model.recognize_faces(crops)):
+            track.name, track.score, track.confidence = name, score, score
+        self.stats['recognitions'] += len(pending)
+
+    def update(self, frame):
+        """Advance one frame; returns the live tracks."""
+        small = self._small_gray(frame)
+        detect = self.force_detect or self.frame_index % self.detect_every == 0
+        if detect:
+            self._detect(frame, small)
+            self._recognize(frame)
+            self.force_detect = False
+        else:
+            for track in self.tracks:
+                self._follow(track, small)
+                track.confidence *= CONFIDENCE_DECAY
+            live = [t for t in self.tracks if not t.lost]
+            # a lost track means someone moved fast or left: look again next frame
+            self.force_detect = len(live) < len(self.tracks)
+            self.tracks = live
+        self.frame_index += 1
+        self.stats['frames'] += 1
+        return self.tracks
+
+    def annotate(self, frame):
+        for track in self.update(frame):
+            x, y, w, h = track.box
+            if track.name is not None:
+                label = f"{track.name}: {track.score:.2f}"
+                cv2.putText(frame, label, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+        return frame
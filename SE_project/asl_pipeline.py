@@ -0,0 +1,218 @@
+import queue
+import threading
+import time
+
+import cv2
+
+from gesture_stream import SEQUENCE_LENGTH
+
+QUEUE_SIZE = 2         # frames in flight between stages; small keeps the video live
+
+
+def put_latest(q, item):
+    """Put without blocking, dropping the oldest queued item if the queue is full."""
+    while True:
+        try:
+            q.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+
+
+class ASLPipeline:
+    """
+    Camera -> landmarks -> gesture -> sentence, one thread per stage.
+
+        capture    cap.read() + mirror          --frames-->    (drops oldest)
+        landmarks  hands.process + drawing      --landmarks--> (blocks)
+        gesture    GestureStream.push           --results-->   UI thread (drops oldest)
+                                                --words-->     UI thread (never dropped)
+        sentence   generate_sentence(words)     <-requests-- UI, --sentences--> UI
+
+    The UI thread (cv2.imshow/waitKey must stay on it) reads `next_result()`,
+    `poll_words()` and `poll_sentence()` and queues sentence requests, so a slow T5
+    `generate` no longer freezes the video. Queues between live stages are
+    bounded: capture and display keep only the newest frames, while frames
+    that reached the landmark stage all go to the gesture stage, so the
+    30-frame windows stay consecutive. Threads rather than processes:
+    MediaPipe, TensorFlow and PyTorch release the GIL in their native code,
+    and the models stay loaded once.
+
+    With live=False (replaying a file) nothing is dropped: every stage
+    blocks on the next, so the source is read as fast as the slowest stage
+    allows. With hands=None the source yields landmark rows (63 values, or
+    None for "no hand") instead of camera frames and MediaPipe is skipped.
+
+    A result is a dict with the annotated frame, `label` (current prediction
+    once the window is full, else None) and `captured` (perf_counter at
+    capture). A None result means the source ended.
+
+    Every sentence request gets exactly one reply, {'sentence': str or None,
+    'error': str or None}, so the UI can tell a finished request from a
+    failed one and never waits on a request that raised.
+    """
+    def __init__(self, cap, hands, draw_hand, stream, generate_sentence, queue_size=QUEUE_SIZE, live=True):
+        self.cap = cap
+        self.hands = hands
+        self.draw_hand = draw_hand
+        self.stream = stream
+        self.generate_sentence = generate_sentence
+        self.live = live
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.landmarks = queue.Queue(maxsize=queue_size)
+        self.results = queue.Queue(maxsize=queue_size)
+        self.words = queue.Queue()
+        self.requests = queue.Queue(maxsize=4)
+        self.sentences = queue.Queue()
+        self.stop = threading.Event()
+        self.threads = []
+        self.dropped = 0
+        self.busy = {'capture': 0.0, 'landmarks': 0.0, 'gesture': 0.0, 'sentence': 0.0}
+        self.items = dict.fromkeys(self.busy, 0)
+
+    def start(self):
+        for name, target in [('capture', self._capture), ('landmarks', self._landmarks),
+                             ('gesture', self._gesture), ('sentence', self._sentence)]:
+            thread = threading.Thread(target=target, name=f'asl-{name}', daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def close(self):
+        self.stop.set()
+        for thread in self.threads:
+            thread.join(timeout=5.0)
+
+    # ---------- Stage helpers ----------
+    def _get(self, q):
+        while not self.stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def _put(self, q, item):
+        while not self.stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _emit(self, q, item):
+        # live: keep the newest item; replay: wait for the next stage
+        if not self.live:
+            self._put(q, item)
+            return
+        if q.full():
+            self.dropped += 1
+        put_latest(q, item)
+
+    def _timed(self, stage, started):
+        self.busy[stage] += time.perf_counter() - started
+        self.items[stage] += 1
+
+    def stage_ms(self):
+        """Mean time per item in each stage (capture includes waiting for the camera)."""
+        return {stage: self.busy[stage] / self.items[stage] * 1000 if self.items[stage] else 0.0
+                for stage in self.busy}
+
+    # ---------- Stages ----------
+    def _capture(self):
+        while not self.stop.is_set():
+            started = time.perf_counter()
+            ret, frame = self.cap.read()
+            if not ret:
+                self._emit(self.frames, None)                # end of stream / camera gone
+                return
+            if self.hands is not None:
+                frame = cv2.flip(frame, 1)
+            self._timed('capture', started)
+            self._emit(self.frames, (started, frame))
+
+    def _landmarks(self):
+        while True:
+            item = self._get(self.frames)
+            if item is None:
+                self._put(self.landmarks, None)
+                return
+            captured, frame = item
+            started = time.perf_counter()
+            if self.hands is None:                           # replayed landmark row
+                hands, frame = ([] if frame is None else [frame]), None
+            else:
+                result = self.hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                hands = []
+                for hand_landmarks in result.multi_hand_landmarks or []:
+                    self.draw_hand(frame, hand_landmarks)
+                    hands.append([v for lm in hand_landmarks.landmark for v in (lm.x, lm.y, lm.z)])
+            self._timed('landmarks', started)
+            self._put(self.landmarks, (captured, frame, hands))
+
+    def _gesture(self):
+        while True:
+            item = self._get(self.landmarks)
+            if item is None:
+                self._emit(self.results, None)
+                return
+            captured, frame, hands = item
+            started = time.perf_counter()
+            for landmarks in hands:
+                _, word = self.stream.push(landmarks)
+                if word is not None:
+                    self.words.put(word)
+            if not hands:
+                self.stream.reset()
+            label = self.stream.last_prediction if hands and self.stream.filled == SEQUENCE_LENGTH else None
+            self._timed('gesture', started)
+            self._emit(self.results, {'frame': frame, 'label': label, 'captured': captured})
+
+    def _sentence(self):
+        while not self.stop.is_set():
+            words = self._get(self.requests)
+            if words is None:
+                return
+            started = time.perf_counter()
+            try:
+                reply = {'sentence': self.generate_sentence(words), 'error': None}
+            except Exception as e:
+                print(f"⚠️ Sentence generation failed: {e}")
+                reply = {'sentence': None, 'error': str(e) or type(e).__name__}
+            self._timed('sentence', started)
+            self.sentences.put(reply)
+
+    # ---------- UI side ----------
+    def next_result(self, timeout=1.0):
+        """Newest classified frame (dict), None once the source has ended; raises queue.Empty on timeout."""
+        return self.results.get(timeout=timeout)
+
+    def poll_words(self):
+        """Words accepted by the gesture stage since the last call, oldest first."""
+        words = []
+        while True:
+            try:
+                words.append(self.words.get_nowait())
+            except queue.Empty:
+                return words
+
+    def request_sentence(self, words):
+        """Queue a T5 request; False if too many are already waiting."""
+        try:
+            self.requests.put_nowait(list(words))
+            return True
+        except queue.Full:
+            return False
+
+    def poll_sentence(self):
+        """The next sentence reply (see class docstring), or None if none is ready."""
+        return self.wait_sentence(timeout=0)
+
+    def wait_sentence(self, timeout):
+        try:
+            return self.sentences.get(timeout=timeout) if timeout else self.sentences.get_nowait()
+        except queue.Empty:
+            return None
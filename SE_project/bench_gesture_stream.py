@@ -0,0 +1,72 @@
+# Per-frame classification latency / FPS: the old list + model.predict loop
+# vs. GestureStream (ring buffer + compiled call) at a few strides.
+# Feeds synthetic landmark frames, so no camera or MediaPipe is needed.
+#   python bench_gesture_stream.py [--frames 600]
+# Uses asl_dynamic_lstm.h5 if present, otherwise an untrained model of the same shape.
+import argparse
+import os
+import time
+
+import numpy as np
+from tensorflow.keras.layers import LSTM, Dense, Dropout, Input
+from tensorflow.keras.models import Sequential, load_model
+
+from gesture_stream import GestureStream, SEQUENCE_LENGTH, NUM_FEATURES, PREPROCESSING
+
+STRIDES = [1, 3, 5]
+
+
+def gesture_model(n_labels):
+    if os.path.exists("asl_dynamic_lstm.h5"):
+        return load_model("asl_dynamic_lstm.h5")
+    # same layers as train_lstm.py
+    return Sequential([Input((SEQUENCE_LENGTH, NUM_FEATURES)), LSTM(64, return_sequences=True), Dropout(0.4),
+                       LSTM(64), Dropout(0.4), Dense(64, activation='relu'), Dense(n_labels, activation='softmax')])
+
+
+def legacy(model, labels, frames):
+    sequence, last_prediction, same_pred_counter = [], None, 0
+    for landmarks in frames:
+        sequence.append(list(landmarks))
+        if len(sequence) > 30:
+            sequence.pop(0)
+        if len(sequence) == 30:
+            prediction = model.predict(np.array(sequence).reshape(1, 30, 63), verbose=0)
+            pred_label = labels[np.argmax(prediction)]
+            same_pred_counter = same_pred_counter + 1 if pred_label == last_prediction else 0
+            last_prediction = pred_label
+
+
+def streamed(stream, frames):
+    for landmarks in frames:
+        stream.push(landmarks)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=600)
+    args = parser.parse_args()
+
+    labels = np.load("label_encoder.npy") if os.path.exists("label_encoder.npy") else \
+        np.array(["i", "you", "my", "friend", "go", "school", "at", "12"])
+    model = gesture_model(len(labels))
+    # a slowly drifting hand: 21 landmarks random-walking around the frame centre
+    rng = np.random.default_rng(0)
+    frames = 0.5 + np.cumsum(rng.normal(0, 0.002, size=(args.frames, NUM_FEATURES)), axis=0).astype(np.float32)
+
+    runs = [('model.predict', lambda: legacy(model, labels, frames))]
+    for stride in STRIDES:
+        stream = GestureStream(model, labels, stride=stride, preprocessing=PREPROCESSING)  # as new models run
+        runs.append((f'stream k={stride}', lambda stream=stream: streamed(stream, frames)))
+
+    print(f"{'mode':<14} {'ms/frame':>9} {'FPS':>8}")
+    for name, run in runs:
+        run()                                            # warm-up
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        print(f"{name:<14} {elapsed / args.frames * 1000:>9.2f} {args.frames / elapsed:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
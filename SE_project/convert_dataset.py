@@ -0,0 +1,58 @@
+# Convert the per-sample layout (data/<label>/sample_N.npy) into the consolidated
+# GestureDataset (gestures/sequences.f32 + gestures/index.csv).
+#   python convert_dataset.py [--data data] [--out gestures]
+# Samples already in the dataset (same data/<label>/<file> source) are skipped,
+# so it can be re-run after recording more samples the old way.
+import argparse
+import os
+import time
+
+import numpy as np
+
+from gesture_dataset import GestureDataset, DATASET_DIR
+from gesture_stream import SEQUENCE_LENGTH, NUM_FEATURES
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default="data")
+    parser.add_argument('--out', default=DATASET_DIR)
+    args = parser.parse_args()
+
+    dataset = GestureDataset(args.out)
+    converted = {row['source'] for row in dataset.index()}
+    sequences, labels, sources, skipped = [], [], [], 0
+
+    started = time.perf_counter()
+    for gesture in sorted(os.listdir(args.data)):
+        gesture_path = os.path.join(args.data, gesture)
+        if not os.path.isdir(gesture_path):
+            continue
+        for file in sorted(os.listdir(gesture_path)):
+            source = f"{gesture}/{file}"
+            if not file.endswith(".npy") or source in converted:
+                continue
+            sequence = np.load(os.path.join(gesture_path, file))
+            if sequence.shape != (SEQUENCE_LENGTH, NUM_FEATURES):
+                print(f"⚠️ Skipping {source}: shape {sequence.shape}")
+                skipped += 1
+                continue
+            sequences.append(sequence)
+            labels.append(gesture)
+            sources.append(source)
+    read_seconds = time.perf_counter() - started
+
+    if sequences:
+        dataset.extend(sequences, labels, sources)
+    print(f"✅ Added {len(sequences)} samples ({skipped} skipped, {len(converted)} already converted); "
+          f"{len(dataset)} samples in {args.out}/")
+
+    started = time.perf_counter()
+    X, y = dataset.load()
+    X = np.array(X)
+    print(f"⏱️ Reading {args.data}/ file by file: {read_seconds:.2f}s; "
+          f"loading {args.out}/ ({X.nbytes / 1e6:.1f} MB): {time.perf_counter() - started:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import tensorflow as tf
+
+from gesture_stream import SEQUENCE_LENGTH, NUM_FEATURES
+
+BATCH_SIZE = 32
+TIME_WARP = 0.2          # playback speed varies by up to +-20%
+JITTER = 0.003           # std of per-landmark noise (image units)
+MIRROR_PROBABILITY = 0.5
+AUTOTUNE = tf.data.AUTOTUNE
+
+
+def time_warp(x):
+    """Resample each sequence at a random speed around its middle frame (linear interpolation)."""
+    batch = tf.shape(x)[0]
+    speed = tf.random.uniform((batch, 1), 1 - TIME_WARP, 1 + TIME_WARP)
+    centre = (SEQUENCE_LENGTH - 1) / 2
+    steps = tf.range(SEQUENCE_LENGTH, dtype=tf.float32)[tf.newaxis, :]
+    positions = tf.clip_by_value(centre + (steps - centre) * speed, 0, SEQUENCE_LENGTH - 1)
+    lower = tf.cast(tf.floor(positions), tf.int32)
+    upper = tf.minimum(lower + 1, SEQUENCE_LENGTH - 1)
+    weight = (positions - tf.cast(lower, tf.float32))[:, :, tf.newaxis]
+    return (tf.gather(x, lower, batch_dims=1) * (1 - weight)
+            + tf.gather(x, upper, batch_dims=1) * weight)
+
+
+def mirror(x):
+    """Negate the centred x of every landmark for a random half of the batch (the other hand)."""
+    flip = tf.random.uniform((tf.shape(x)[0], 1, 1)) < MIRROR_PROBABILITY
+    sign = tf.tile(tf.constant([-1.0, 1.0, 1.0]), [NUM_FEATURES // 3])
+    return tf.where(flip, x * sign, x)
+
+
+def augment(x, y):
+    x = time_warp(x)
+    x = mirror(x)
+    x = x + tf.random.normal(tf.shape(x), stddev=JITTER)
+    return x, y
+
+
+def make_datasets(X_train, y_train, X_val, y_val, batch_size=BATCH_SIZE, augmentation=True):
+    """
+    (train, validation) tf.data pipelines over already preprocessed
+    sequences (gesture_stream.preprocess, the same code live prediction
+    uses). Augmentation runs per batch (vectorised, parallel map) on the
+    training set only, so every epoch sees different variations.
+    """
+    train = (tf.data.Dataset.from_tensor_slices((X_train, y_train))
+             .shuffle(len(X_train), reshuffle_each_iteration=True).batch(batch_size))
+    if augmentation:
+        train = train.map(augment, num_parallel_calls=AUTOTUNE)
+    val = tf.data.Dataset.from_tensor_slices((X_val, y_val)).batch(batch_size)
+    return train.prefetch(AUTOTUNE), val.prefetch(AUTOTUNE)
@@ -0,0 +1,82 @@
+import csv
+import os
+from datetime import datetime
+
+import numpy as np
+
+from gesture_stream import SEQUENCE_LENGTH, NUM_FEATURES
+
+DATASET_DIR = "gestures"
+SAMPLE_BYTES = SEQUENCE_LENGTH * NUM_FEATURES * 4      # one float32 (30, 63) sequence
+INDEX_FIELDS = ["label", "source", "recorded_at"]
+
+
+class GestureDataset:
+    """
+    All recorded gesture sequences in one appendable store:
+
+        gestures/sequences.f32   raw float32, sample after sample (N * 30 * 63)
+        gestures/index.csv       one row per sample: label, source, recorded_at
+
+    `load()` memory-maps the sequences as an (N, 30, 63) array, so training
+    and evaluation read the whole dataset in one sequential read instead of
+    opening thousands of data/<label>/sample_N.npy files.
+
+    Appending writes the sequences first and the index rows last; the index
+    row count is the sample count, so a crash between the two leaves extra
+    bytes that are ignored and overwritten by the next append.
+    """
+    def __init__(self, path=DATASET_DIR):
+        self.path = path
+        self.sequences_path = os.path.join(path, "sequences.f32")
+        self.index_path = os.path.join(path, "index.csv")
+
+    def exists(self):
+        return os.path.exists(self.index_path)
+
+    def index(self):
+        if not self.exists():
+            return []
+        with open(self.index_path, newline='', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+
+    def __len__(self):
+        return len(self.index())
+
+    def append(self, sequence, label, source=""):
+        self.extend([sequence], [label], [source])
+
+    def extend(self, sequences, labels, sources=None):
+        sequences = np.asarray(sequences, dtype=np.float32)
+        if sequences.ndim != 3 or sequences.shape[1:] != (SEQUENCE_LENGTH, NUM_FEATURES):
+            raise ValueError(f"Expected sequences of shape (n, {SEQUENCE_LENGTH}, {NUM_FEATURES}), "
+                             f"got {sequences.shape}")
+        if len(labels) != len(sequences):
+            raise ValueError("One label per sequence is required")
+        sources = sources if sources is not None else [""] * len(sequences)
+        os.makedirs(self.path, exist_ok=True)
+        count = len(self)
+        with open(self.sequences_path, 'r+b' if os.path.exists(self.sequences_path) else 'wb') as f:
+            f.truncate(count * SAMPLE_BYTES)               # drop bytes from an interrupted append
+            f.seek(count * SAMPLE_BYTES)
+            f.write(sequences.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        new_index = not self.exists()
+        recorded_at = datetime.now().isoformat(timespec='seconds')
+        with open(self.index_path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=INDEX_FIELDS)
+            if new_index:
+                writer.writeheader()
+            writer.writerows({'label': label, 'source': source, 'recorded_at': recorded_at}
+                             for label, source in zip(labels, sources))
+
+    def load(self):
+        """(X, y): memory-mapped (N, 30, 63) float32 sequences and their labels."""
+        index = self.index()
+        if not index:
+            raise FileNotFoundError(f"No gesture dataset in {self.path}/ "
+                                    f"(record some, or run convert_dataset.py on data/)")
+        X = np.memmap(self.sequences_path, dtype=np.float32, mode='r',
+                      shape=(len(index), SEQUENCE_LENGTH, NUM_FEATURES))
+        return X, np.array([row['label'] for row in index])
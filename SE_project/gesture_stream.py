@@ -0,0 +1,139 @@
+import json
+import os
+import time
+
+import numpy as np
+
+SEQUENCE_LENGTH = 30     # frames per gesture, as recorded by record_gesture_sequences.py
+NUM_FEATURES = 63        # 21 hand landmarks * (x, y, z)
+STABLE_PREDICTIONS = 5   # a label repeated this many more times in a row becomes a word
+PREPROCESSING = "first_wrist"   # what train_lstm.py trains new models on
+
+
+def center_on_first_wrist(sequences):
+    """
+    (..., 30, 63) landmarks relative to the wrist (landmark 0) of each
+    sequence's first frame. Only the starting position in the image is
+    removed; the hand shape and its motion path, which a dynamic gesture is
+    made of, are kept.
+    """
+    points = np.asarray(sequences, dtype=np.float32).reshape(-1, SEQUENCE_LENGTH, 21, 3)
+    return (points - points[:, :1, :1, :]).reshape(np.shape(sequences))
+
+
+def preprocess(sequences, preprocessing):
+    """Model input for `preprocessing` (None: raw image coordinates, as older models were trained)."""
+    if preprocessing is None:
+        return np.asarray(sequences, dtype=np.float32)
+    if preprocessing == "first_wrist":
+        return center_on_first_wrist(sequences)
+    raise ValueError(f"Unknown gesture preprocessing: {preprocessing!r}")
+
+
+def preprocessing_path(model_path):
+    return os.path.splitext(model_path)[0] + ".preprocessing.json"
+
+
+def save_preprocessing(model_path, preprocessing=PREPROCESSING):
+    with open(preprocessing_path(model_path), 'w', encoding='utf-8') as f:
+        json.dump({'preprocessing': preprocessing}, f)
+
+
+def load_preprocessing(model_path):
+    """The preprocessing a model was trained with; None (raw coordinates) if it has no marker file."""
+    try:
+        with open(preprocessing_path(model_path), encoding='utf-8') as f:
+            return json.load(f)['preprocessing']
+    except FileNotFoundError:
+        return None
+
+
+class GestureStream:
+    """
+    Streaming gesture classifier over the last SEQUENCE_LENGTH landmark frames.
+
+    Frames go into a preallocated (30, 63) float32 ring buffer instead of a
+    list that is popped from the front and re-converted with np.array every
+    frame. Once the buffer is full the model runs every `stride` frames,
+    through a tf.function traced once for a (1, 30, 63) input rather than
+    `model.predict` (which sets up a data pipeline on every call).
+
+    `push()` returns (label, word): label is this frame's prediction (None
+    when the model did not run) and word is set when the same label has been
+    predicted `stable` more times in a row — the old same_pred_counter rule.
+    The counter runs over predictions, so with a stride of k a word needs
+    k times as many frames.
+
+    `preprocessing` must be what the model was trained with
+    (load_preprocessing(model_path)); None feeds raw coordinates.
+    """
+    def __init__(self, model, labels, stride=1, stable=STABLE_PREDICTIONS, preprocessing=None):
+        preprocess(np.zeros((SEQUENCE_LENGTH, NUM_FEATURES)), preprocessing)   # fail early if unknown
+        self.labels = labels
+        self.preprocessing = preprocessing
+        self.stride = max(1, int(stride))
+        self.stable = stable
+        self.buffer = np.zeros((SEQUENCE_LENGTH, NUM_FEATURES), dtype=np.float32)
+        self.window = np.zeros((1, SEQUENCE_LENGTH, NUM_FEATURES), dtype=np.float32)
+        self.pos = 0                 # next slot to write
+        self.filled = 0
+        self.since_predict = self.stride - 1     # predict as soon as the window is full
+        self.last_prediction = None
+        self.same_pred_counter = 0
+        import tensorflow as tf      # here, so the constants above can be imported without TF
+        self._call = tf.function(lambda x: model(x, training=False), input_signature=[
+            tf.TensorSpec((1, SEQUENCE_LENGTH, NUM_FEATURES), tf.float32)])
+        self._call(self.window)      # trace now, not on the first gesture
+        self.frames = 0
+        self.predictions = 0
+        self.predict_seconds = 0.0
+
+    def reset(self):
+        """Hand lost: start a new window (the debounce state carries over, as before)."""
+        self.pos = 0
+        self.filled = 0
+        self.since_predict = self.stride - 1
+
+    def push(self, landmarks):
+        self.buffer[self.pos] = landmarks
+        self.pos = (self.pos + 1) % SEQUENCE_LENGTH
+        self.filled = min(self.filled + 1, SEQUENCE_LENGTH)
+        self.frames += 1
+        if self.filled < SEQUENCE_LENGTH:
+            return None, None
+        self.since_predict += 1
+        if self.since_predict < self.stride:
+            return None, None
+        self.since_predict = 0
+        return self._predict()
+
+    def _predict(self):
+        # oldest frame first: buffer[pos:] then buffer[:pos], into the preallocated window
+        tail = SEQUENCE_LENGTH - self.pos
+        self.window[0, :tail] = self.buffer[self.pos:]
+        self.window[0, tail:] = self.buffer[:self.pos]
+        if self.preprocessing is not None:
+            self.window[0] = preprocess(self.window[0], self.preprocessing)
+        started = time.perf_counter()
+        probabilities = self._call(self.window).numpy()
+        self.predict_seconds += time.perf_counter() - started
+        self.predictions += 1
+        label = self.labels[int(np.argmax(probabilities))]
+
+        if label == self.last_prediction:
+            self.same_pred_counter += 1
+        else:
+            self.same_pred_counter = 0
+        self.last_prediction = label
+        word = None
+        if self.same_pred_counter == self.stable:
+            word = label
+            self.same_pred_counter = 0
+        return label, word
+
+    def stats(self):
+        return {
+            'frames': self.frames,
+            'predictions': self.predictions,
+            'predict_ms': self.predict_seconds / self.predictions * 1000 if self.predictions else 0.0,
+        }
@@ -1,4 +1,3 @@
-import os
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -8,21 +7,17 @@ from sklearn.preprocessing import LabelEncoder
 from tensorflow.keras.models import load_model
 from tensorflow.keras.utils import to_categorical
 
+from gesture_dataset import GestureDataset
+from gesture_stream import load_preprocessing, preprocess
+
 # Load model
-model = load_model("asl_dynamic_lstm.h5")
+MODEL_PATH = "asl_dynamic_lstm.h5"
+model = load_model(MODEL_PATH)
 labels = np.load("label_encoder.npy")
 
-# Load dataset
-DATA_PATH = "data"
-sequences, y_labels = [], []
-
-for gesture in os.listdir(DATA_PATH):
-    for file in os.listdir(os.path.join(DATA_PATH, gesture)):
-        sequences.append(np.load(os.path.join(DATA_PATH, gesture, file)))
-        y_labels.append(gesture)
-
-X = np.array(sequences)
-y_true = np.array(y_labels)
+# Load dataset (one read of gestures/)
+X, y_true = GestureDataset().load()
+X = preprocess(X, load_preprocessing(MODEL_PATH))  # what the model was trained on (raw if no marker)
 
 # Encode
 le = LabelEncoder()
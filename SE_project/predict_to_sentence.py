@@ -4,9 +4,17 @@ import numpy as np
 from tensorflow.keras.models import load_model
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 import torch
+import queue
+import time
+
+from asl_pipeline import ASLPipeline
+from gesture_stream import GestureStream, load_preprocessing
+
+PREDICT_STRIDE = 1  # run the LSTM every N frames once 30 are buffered (2-3 halves/thirds the cost)
 
 # Load gesture recognition model and label encoder
-model = load_model("asl_dynamic_lstm.h5")
+MODEL_PATH = "asl_dynamic_lstm.h5"
+model = load_model(MODEL_PATH)
 labels = np.load("label_encoder.npy")
 
 # 🔁 Load your own fine-tuned T5 model
@@ -19,10 +27,8 @@ hands = mp_hands.Hands()
 mp_draw = mp.solutions.drawing_utils
 
 # Buffers
-sequence = []
+stream = GestureStream(model, labels, stride=PREDICT_STRIDE, preprocessing=load_preprocessing(MODEL_PATH))
 recognized_words = []
-last_prediction = None
-same_pred_counter = 0
 
 # Sentence display
 final_sentence = ""
@@ -31,49 +37,59 @@ sentence_timer = 0  # Countdown timer to display sentence for N frames
 # Word order priority (helps grammar model)
 preferred_order = ["i", "you", "my", "friend", "go", "school", "at", "12"]
 
+
+def generate_sentence(words):
+    # Runs on the pipeline's sentence thread, so the video keeps playing meanwhile
+    input_text = "fix: " + " ".join(words)
+    input_ids = tokenizer(input_text, return_tensors="pt").input_ids
+    with torch.no_grad():
+        output = t5.generate(input_ids, max_length=50, num_beams=4, early_stopping=True)
+    return tokenizer.decode(output[0], skip_special_tokens=True)
+
+
+def draw_hand(frame, hand_landmarks):
+    mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+
+
 cap = cv2.VideoCapture(0)
+pipeline = ASLPipeline(cap, hands, draw_hand, stream, generate_sentence).start()
 
 print("📸 ASL-to-Sentence is running...\nPress [ENTER] to generate sentence\nPress 'd' to delete last word\nPress 'q' to quit")
 
+frame_count = 0
+latency_seconds = 0.0
+fps = 0.0
+last_shown = None
+generating = 0  # sentence requests still running
+
 while True:
-    ret, frame = cap.read()
-    frame = cv2.flip(frame, 1)
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    result = hands.process(rgb)
-
-    if result.multi_hand_landmarks:
-        for hand_landmarks in result.multi_hand_landmarks:
-            mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-
-            landmarks = []
-            for lm in hand_landmarks.landmark:
-                landmarks.extend([lm.x, lm.y, lm.z])
-            sequence.append(landmarks)
-
-            if len(sequence) > 30:
-                sequence.pop(0)
-
-            if len(sequence) == 30:
-                input_data = np.array(sequence).reshape(1, 30, 63)
-                prediction = model.predict(input_data, verbose=0)
-                pred_index = np.argmax(prediction)
-                pred_label = labels[pred_index]
-
-                if pred_label == last_prediction:
-                    same_pred_counter += 1
-                else:
-                    same_pred_counter = 0
-                last_prediction = pred_label
-
-                if same_pred_counter == 5:
-                    if not recognized_words or pred_label != recognized_words[-1]:
-                        recognized_words.append(pred_label)
-                    same_pred_counter = 0
-
-                cv2.putText(frame, f"Detected: {pred_label}", (10, 40),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 0), 3)
-    else:
-        sequence = []
+    try:
+        result = pipeline.next_result(timeout=1.0)
+    except queue.Empty:
+        if cv2.waitKey(1) == ord('q'):
+            break
+        continue
+    if result is None:  # camera closed
+        break
+    frame = result['frame']
+
+    for word in pipeline.poll_words():
+        if not recognized_words or word != recognized_words[-1]:
+            recognized_words.append(word)
+
+    reply = pipeline.poll_sentence()
+    if reply is not None:
+        generating -= 1  # failed requests finish too
+        if reply['error'] is None:
+            final_sentence = reply['sentence']
+            print("🧠 Generated Sentence:", final_sentence)
+        else:
+            final_sentence = "(generation failed, see console)"
+        sentence_timer = 90  # show for ~3 seconds at 30 FPS
+
+    if result['label'] is not None:
+        cv2.putText(frame, f"Detected: {result['label']}", (10, 40),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 0), 3)
 
     # Draw live word buffer
     word_display = " ".join(recognized_words[-10:])
@@ -81,11 +97,26 @@ while True:
                 cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
 
     # Draw final generated sentence
-    if sentence_timer > 0:
+    if generating > 0:
+        cv2.putText(frame, "🧠 Generating sentence...", (10, 410),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
+    elif sentence_timer > 0:
         cv2.putText(frame, f"🧠 Sentence: {final_sentence}", (10, 410),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
         sentence_timer -= 1
 
+    # Capture-to-display latency and display rate
+    now = time.perf_counter()
+    latency = now - result['captured']
+    frame_count += 1
+    latency_seconds += latency
+    if last_shown is not None:
+        interval = max(now - last_shown, 1e-6)
+        fps = 0.9 * fps + 0.1 / interval if fps else 1 / interval
+    last_shown = now
+    cv2.putText(frame, f"{latency * 1000:.0f} ms latency ({fps:.0f} FPS)", (10, 80),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 1)
+
     # Key handling
     key = cv2.waitKey(1)
 
@@ -93,14 +124,11 @@ while True:
         # 🔃 Reorder recognized words based on preferred order
         ordered_words = [w for w in preferred_order if w in recognized_words]
 
-        input_text = "fix: " + " ".join(ordered_words)
-        input_ids = tokenizer(input_text, return_tensors="pt").input_ids
-        output = t5.generate(input_ids, max_length=50, num_beams=4, early_stopping=True)
-        final_sentence = tokenizer.decode(output[0], skip_special_tokens=True)
-        print("🧠 Generated Sentence:", final_sentence)
-
-        recognized_words = []
-        sentence_timer = 90  # show for ~3 seconds at 30 FPS
+        if pipeline.request_sentence(ordered_words):
+            generating += 1
+            recognized_words = []
+        else:
+            print("⏳ Still generating previous sentences, try again.")
 
     elif key == ord('d'):  # Delete last word
         if recognized_words:
@@ -112,5 +140,11 @@ while True:
 
     cv2.imshow("ASL Real-Time Sentence Generator", frame)
 
+pipeline.close()
 cap.release()
 cv2.destroyAllWindows()
+
+stats = stream.stats()
+if frame_count:
+    print(f"⏱️ {frame_count} frames shown, {latency_seconds / frame_count * 1000:.1f} ms capture-to-display, "
+          f"{pipeline.dropped} frames dropped, {stats['predictions']} LSTM calls at {stats['predict_ms']:.1f} ms")
@@ -1,12 +1,11 @@
 import cv2
 import mediapipe as mp
-import numpy as np
-import os
 import time
 
+from gesture_dataset import GestureDataset
+
 GESTURE_LABEL = "12"  # Change this for each gesture
-SAVE_PATH = f"data/{GESTURE_LABEL}"
-os.makedirs(SAVE_PATH, exist_ok=True)
+dataset = GestureDataset()  # appends to gestures/sequences.f32 + gestures/index.csv
 
 mp_hands = mp.solutions.hands
 hands = mp_hands.Hands()
@@ -16,7 +15,7 @@ cap = cv2.VideoCapture(0)
 sequence = []
 recording = False
 countdown_start_time = None
-sample_count = 0
+sample_count = sum(1 for row in dataset.index() if row['label'] == GESTURE_LABEL)
 COUNTDOWN_SECONDS = 3
 
 print("🎥 Press 's' to start 30-frame recording after a countdown. Press 'q' to quit.")
@@ -41,7 +40,7 @@ while True:
                             cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
 
                 if len(sequence) == 30:
-                    np.save(f"{SAVE_PATH}/sample_{sample_count}.npy", np.array(sequence))
+                    dataset.append(sequence, GESTURE_LABEL, source=f"{GESTURE_LABEL}/sample_{sample_count}")
                     print(f"✅ Saved: sample_{sample_count}")
                     sample_count += 1
                     sequence = []
@@ -0,0 +1,213 @@
+# Replay recorded videos or saved landmark streams through the same pipeline as
+# predict_to_sentence.py (ASLPipeline + GestureStream), as fast as it will go,
+# for benchmarks and regression checks without a camera.
+#   python replay_asl.py clip1.mp4 clip2.mp4 [--headless] [--stride 3] [--json report.json]
+#   python replay_asl.py data/hello data/you --gap 10 --headless   # .npy landmarks, no MediaPipe
+#   python replay_asl.py gestures --label hello you --gap 10 --headless   # GestureDataset samples
+# Reports frames/sec, mean time per stage, capture-to-result latency and the recognized words.
+import argparse
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+from tensorflow.keras.models import load_model
+
+from asl_pipeline import ASLPipeline
+from gesture_dataset import GestureDataset
+from gesture_stream import GestureStream, NUM_FEATURES, load_preprocessing
+
+
+class VideoReplay:
+    """cap-like source that plays several video files back to back."""
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self.cap = None
+
+    def read(self):
+        while True:
+            if self.cap is not None:
+                ret, frame = self.cap.read()
+                if ret:
+                    return ret, frame
+                self.cap.release()
+            if not self.paths:
+                return False, None
+            self.cap = cv2.VideoCapture(self.paths.pop(0))
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+
+
+class LandmarkReplay:
+    """
+    cap-like source over saved landmarks: .npy files of shape (T, 63) or
+    (N, 30, 63) (e.g. data/<label>/sample_N.npy), played back to back with
+    `gap` no-hand frames after each file. Rows containing NaN also count as
+    "no hand". Frames are landmark rows, for ASLPipeline(hands=None).
+    """
+    def __init__(self, paths, gap=0):
+        self._play((np.load(path) for path in paths), gap)
+
+    def _play(self, sequences, gap):
+        chunks = []
+        for sequence in sequences:
+            chunks.append(np.asarray(sequence, dtype=np.float32).reshape(-1, NUM_FEATURES))
+            if gap:
+                chunks.append(np.full((gap, NUM_FEATURES), np.nan, dtype=np.float32))
+        self.rows = np.concatenate(chunks) if chunks else np.empty((0, NUM_FEATURES), np.float32)
+        self.pos = 0
+
+    def read(self):
+        if self.pos >= len(self.rows):
+            return False, None
+        row = self.rows[self.pos]
+        self.pos += 1
+        return True, None if np.isnan(row).any() else row
+
+    def release(self):
+        pass
+
+
+class DatasetReplay(LandmarkReplay):
+    """
+    LandmarkReplay over GestureDataset stores (gestures/): every sample in
+    recording order, or only those whose label is in `labels`, each followed
+    by `gap` no-hand frames.
+    """
+    def __init__(self, paths, labels=None, gap=0):
+        def samples():
+            for path in paths:
+                X, y = GestureDataset(path).load()
+                keep = np.isin(y, labels) if labels else np.ones(len(y), dtype=bool)
+                yield from X[keep]
+        self._play(samples(), gap)
+
+
+def expand(inputs, ext):
+    """Files as given; directories -> their `ext` files, recursively and sorted."""
+    paths = []
+    for path in inputs:
+        if os.path.isdir(path):
+            paths += sorted(os.path.join(root, f) for root, _, files in os.walk(path)
+                            for f in files if f.lower().endswith(ext))
+        else:
+            paths.append(path)
+    return paths
+
+
+def t5_generator(model_dir):
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    t5 = AutoModelForSeq2SeqLM.from_pretrained(model_dir)
+
+    def generate_sentence(words):
+        input_ids = tokenizer("fix: " + " ".join(words), return_tensors="pt").input_ids
+        with torch.no_grad():
+            output = t5.generate(input_ids, max_length=50, num_beams=4, early_stopping=True)
+        return tokenizer.decode(output[0], skip_special_tokens=True)
+    return generate_sentence
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('inputs', nargs='+',
+                        help="video files, .npy landmark files / directories, or GestureDataset directories")
+    parser.add_argument('--headless', action='store_true', help="no window, just the report")
+    parser.add_argument('--stride', type=int, default=1, help="run the LSTM every N frames")
+    parser.add_argument('--gap', type=int, default=0, help="no-hand frames after each .npy file / dataset sample")
+    parser.add_argument('--label', nargs='+', help="replay only these labels from a GestureDataset")
+    parser.add_argument('--model', default="asl_dynamic_lstm.h5")
+    parser.add_argument('--labels', default="label_encoder.npy")
+    parser.add_argument('--sentence', metavar='T5_DIR', help="also generate a sentence with this T5 model")
+    parser.add_argument('--json', help="write the report here")
+    args = parser.parse_args()
+
+    stream = GestureStream(load_model(args.model), np.load(args.labels), stride=args.stride,
+                           preprocessing=load_preprocessing(args.model))
+    generate_sentence = t5_generator(args.sentence) if args.sentence else None
+    datasets = [path for path in args.inputs if GestureDataset(path).exists()]
+    landmark_files = expand(args.inputs, '.npy')
+    if datasets:
+        if len(datasets) != len(args.inputs):
+            parser.error("GestureDataset directories cannot be mixed with other inputs")
+        source, hands, draw_hand = DatasetReplay(datasets, labels=args.label, gap=args.gap), None, None
+    elif landmark_files and all(path.lower().endswith('.npy') for path in landmark_files):
+        source, hands, draw_hand = LandmarkReplay(landmark_files, gap=args.gap), None, None
+    else:
+        import mediapipe as mp
+        mp_hands = mp.solutions.hands
+        source, hands = VideoReplay(args.inputs), mp_hands.Hands()
+        draw_hand = lambda frame, hand: mp.solutions.drawing_utils.draw_landmarks(frame, hand, mp_hands.HAND_CONNECTIONS)
+
+    pipeline = ASLPipeline(source, hands, draw_hand, stream, generate_sentence, live=False).start()
+    started = time.perf_counter()
+    latencies, words = [], []
+    while True:
+        result = pipeline.next_result(timeout=60)
+        if result is None:
+            break
+        latencies.append(time.perf_counter() - result['captured'])
+        for word in pipeline.poll_words():
+            if not words or word != words[-1]:          # same rule as predict_to_sentence.py
+                words.append(word)
+        if not args.headless and result['frame'] is not None:
+            frame = result['frame']
+            if result['label'] is not None:
+                cv2.putText(frame, f"Detected: {result['label']}", (10, 40),
+                            cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 0), 3)
+            cv2.imshow("ASL replay", frame)
+            if cv2.waitKey(1) == ord('q'):
+                break
+    elapsed = time.perf_counter() - started
+    for word in pipeline.poll_words():
+        if not words or word != words[-1]:
+            words.append(word)
+
+    sentence = sentence_error = None
+    if generate_sentence and words:
+        pipeline.request_sentence(words)
+        reply = pipeline.wait_sentence(timeout=300)
+        if reply is None:
+            sentence_error = "timed out"
+        else:
+            sentence, sentence_error = reply['sentence'], reply['error']
+    pipeline.close()
+    source.release()
+    if not args.headless:
+        cv2.destroyAllWindows()
+
+    stats = stream.stats()
+    report = {
+        'inputs': args.inputs,
+        'frames': len(latencies),
+        'seconds': round(elapsed, 3),
+        'fps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'stride': args.stride,
+        'stage_ms': {stage: round(ms, 3) for stage, ms in pipeline.stage_ms().items()},
+        'latency_ms': {'p50': round(float(np.percentile(latencies, 50)) * 1000, 2),
+                       'p95': round(float(np.percentile(latencies, 95)) * 1000, 2)} if latencies else None,
+        'predictions': stats['predictions'],
+        'words': [str(word) for word in words],
+        'sentence': sentence,
+        'sentence_error': sentence_error,
+    }
+    print(f"🎞️ {report['frames']} frames in {report['seconds']:.2f}s ({report['fps']:.1f} FPS)")
+    print("⏱️ ms/frame per stage: " + ", ".join(f"{stage} {ms:.2f}" for stage, ms in report['stage_ms'].items()))
+    if report['latency_ms']:
+        print(f"⏱️ capture-to-result latency: p50 {report['latency_ms']['p50']} ms, p95 {report['latency_ms']['p95']} ms")
+    print("📝 Words:", " ".join(report['words']) or "(none)")
+    if sentence is not None:
+        print("🧠 Sentence:", sentence)
+    elif sentence_error is not None:
+        print("⚠️ Sentence generation failed:", sentence_error)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
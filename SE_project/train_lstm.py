@@ -1,29 +1,22 @@
 import os
+import time
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 from tensorflow.keras.utils import to_categorical
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Dropout
-from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping
+from tensorflow.keras.callbacks import Callback, LambdaCallback, ModelCheckpoint, EarlyStopping
 
-# Load data
-DATA_PATH = "data"
-sequences, labels = [], []
+from gesture_augment import make_datasets
+from gesture_dataset import GestureDataset
+from gesture_stream import PREPROCESSING, preprocess, save_preprocessing
 
-for gesture in os.listdir(DATA_PATH):
-    gesture_path = os.path.join(DATA_PATH, gesture)
-    if not os.path.isdir(gesture_path): continue
-    for file in os.listdir(gesture_path):
-        sequence = np.load(os.path.join(gesture_path, file))
-        sequences.append(sequence)
-        labels.append(gesture)
+MODEL_PATH = "asl_dynamic_lstm.h5"
 
-X = np.array(sequences)
-y = np.array(labels)
-
-# Normalize (optional)
-# X = np.array([seq - np.mean(seq, axis=0) for seq in X])
+# Load data (one read of gestures/; convert an old data/ folder with convert_dataset.py)
+X, y = GestureDataset().load()
+X = preprocess(X, PREPROCESSING)  # relative to the first frame's wrist; recorded next to the model
 
 # Encode labels
 label_encoder = LabelEncoder()
@@ -33,6 +26,9 @@ y_cat = to_categorical(y_encoded)
 # Train/test split
 X_train, X_test, y_train, y_test = train_test_split(X, y_cat, test_size=0.3, random_state=42)
 
+# tf.data: augmented per batch (time warp, mirroring, jitter), prefetched
+train_ds, val_ds = make_datasets(X_train, y_train, X_test, y_test)
+
 # Build LSTM model
 model = Sequential()
 model.add(LSTM(64, return_sequences=True, input_shape=(30, 63)))
@@ -44,18 +40,42 @@ model.add(Dense(y_cat.shape[1], activation='softmax'))
 
 model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
 
+class EpochTimer(Callback):
+    # Wall time and CPU use per epoch (100% = one core busy), to compare input pipelines
+    def on_train_begin(self, logs=None):
+        self.epochs = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.started = (time.perf_counter(), time.process_time())
+
+    def on_epoch_end(self, epoch, logs=None):
+        wall = time.perf_counter() - self.started[0]
+        cpu = time.process_time() - self.started[1]
+        self.epochs.append((wall, cpu / wall * 100))
+
+
 # Callbacks
-checkpoint = ModelCheckpoint("asl_dynamic_lstm.h5", save_best_only=True, monitor='val_accuracy', mode='max')
+epoch_timer = EpochTimer()
+checkpoint = ModelCheckpoint(MODEL_PATH, save_best_only=True, monitor='val_accuracy', mode='max')
+# after the checkpoint (epoch 1 always saves), so the marker never describes an older model
+preprocessing_marker = LambdaCallback(on_epoch_end=lambda epoch, logs: save_preprocessing(MODEL_PATH, PREPROCESSING))
 early_stop = EarlyStopping(monitor='val_loss', patience=5, restore_best_weights=True)
 
 # Train
 history = model.fit(
-    X_train, y_train,
+    train_ds,
     epochs=50,
-    validation_data=(X_test, y_test),
-    callbacks=[checkpoint, early_stop]
+    validation_data=val_ds,
+    callbacks=[checkpoint, preprocessing_marker, early_stop, epoch_timer]
 )
 
 # Save encoder
 np.save("label_encoder.npy", label_encoder.classes_)
 print("✅ Training complete. Model and labels saved.")
+
+# First epoch includes tracing and filling the cache, so it is reported separately
+times = epoch_timer.epochs
+if len(times) > 1:
+    steady = times[1:]
+    print(f"⏱️ Epoch 1: {times[0][0]:.2f}s; later epochs: {np.mean([t for t, _ in steady]):.2f}s "
+          f"at {np.mean([c for _, c in steady]):.0f}% CPU ({os.cpu_count()} cores)")